@@ -0,0 +1,121 @@
+"""Асинхронный путь представлений api для ASGI.
+
+Под WSGI каждый запрос держит поток gunicorn, пока ждет БД и пока
+медленный клиент читает ответ. Под ASGI (api_yamdb/urls_asgi.py)
+представления api обернуты в корутины:
+
+* чтение списков и объектов категорий, жанров, произведений, отзывов
+  и комментариев идет в отдельном пуле из ASYNC_READ_CONCURRENCY
+  потоков; сверх этого запросы ждут семафор в цикле событий, не
+  занимая поток и соединение с БД;
+* остальное выполняется там же, где Django исполняет синхронные
+  представления под ASGI: в одном общем потоке.
+
+Под ASGI соединение с БД принадлежит запросу, а не потоку, поэтому
+после чтения оно закрывается; держать соединения открытыми между
+запросами должен пулер (PgBouncer).
+
+Потоковые ответы (titles/export/) под ASGI не отдаются: Django 3.2
+перебирает их синхронно в цикле событий, где запросы к БД запрещены,
+а собрать ответ в памяти значит потерять постоянный расход памяти
+выгрузки. Такой запрос получает 501, выгрузка идет через WSGI.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from weakref import WeakKeyDictionary
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.urls import URLPattern, URLResolver
+
+from . import instrumentation
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+READ_ROUTES = frozenset(
+    f'{basename}-{kind}'
+    for basename in ('categories', 'genres', 'titles', 'reviews', 'comments')
+    for kind in ('list', 'detail')
+)
+
+_pool = {}
+_semaphores = WeakKeyDictionary()
+
+
+def _executor():
+    if 'executor' not in _pool:
+        _pool['executor'] = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_READ_CONCURRENCY,
+            thread_name_prefix='api-read')
+    return _pool['executor']
+
+
+def _semaphore():
+    """Семафор своего цикла событий: у каждого воркера он свой"""
+    loop = asyncio.get_event_loop()
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(
+            settings.ASYNC_READ_CONCURRENCY)
+    return _semaphores[loop]
+
+
+STREAMING_UNSUPPORTED = (
+    'Потоковые ответы под ASGI не поддерживаются: используйте WSGI '
+    '(gunicorn api_yamdb.wsgi)')
+
+
+def _reject_streaming(response):
+    response.close()
+    return JsonResponse({'detail': STREAMING_UNSUPPORTED}, status=501)
+
+
+def _call(view, request, args, kwargs):
+    with instrumentation.record_queries():
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            response = response.render()
+        if response.streaming:
+            response = _reject_streaming(response)
+    return response
+
+
+def _read(view, request, args, kwargs):
+    try:
+        return _call(view, request, args, kwargs)
+    finally:
+        connections.close_all()
+
+
+def asyncify(view, read=False):
+    """Корутина поверх синхронного представления DRF"""
+    reader = sync_to_async(_read, thread_sensitive=False,
+                           executor=_executor())
+    writer = sync_to_async(_call, thread_sensitive=True)
+
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if not read or request.method not in READ_METHODS:
+            return await writer(view, request, args, kwargs)
+        async with _semaphore():
+            return await reader(view, request, args, kwargs)
+
+    return async_view
+
+
+def asyncify_patterns(patterns):
+    """Те же маршруты, представления DRF заменены корутинами"""
+    converted = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(
+                pattern.pattern, asyncify_patterns(pattern.url_patterns),
+                pattern.default_kwargs, pattern.app_name, pattern.namespace)
+        elif hasattr(pattern.callback, 'cls'):
+            pattern = URLPattern(
+                pattern.pattern,
+                asyncify(pattern.callback, pattern.name in READ_ROUTES),
+                pattern.default_args, pattern.name)
+        converted.append(pattern)
+    return converted
@@ -0,0 +1,70 @@
+"""Кэш данных ответов для списков каталога.
+
+Ключ строится из полного URL запроса и версий разделов каталога,
+от которых зависит ответ (reviews.versions). Запись в раздел меняет
+версию, и следующий запрос кладет в кэш свежий ответ.
+
+Данные ответов лежат в отдельном кэше RESPONSES: их много, и их
+вытеснение не задевает версии и счетчики в default.
+"""
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+from reviews import versions
+
+NAMESPACES = (versions.CATEGORIES, versions.GENRES, versions.TITLES)
+
+KEY = 'response:{namespace}:{versions}:{digest}'
+COUNTER_KEY = 'response:{namespace}:{kind}'
+RESPONSES = 'responses'
+HIT = 'hits'
+MISS = 'misses'
+
+
+def make_key(namespace, request, dependencies):
+    digest = md5(request.build_absolute_uri().encode()).hexdigest()
+    return KEY.format(
+        namespace=namespace,
+        versions='.'.join(map(str, versions.get_versions(*dependencies))),
+        digest=digest,
+    )
+
+
+def load(key):
+    return caches[RESPONSES].get(key)
+
+
+def save(key, data):
+    caches[RESPONSES].set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+
+
+def record(namespace, kind):
+    key = COUNTER_KEY.format(namespace=namespace, kind=kind)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def stats():
+    """Счетчики попаданий и промахов по каждому списку"""
+    keys = {
+        COUNTER_KEY.format(namespace=namespace, kind=kind): (namespace, kind)
+        for namespace in NAMESPACES
+        for kind in (HIT, MISS)
+    }
+    counters = cache.get_many(keys)
+    result = {
+        namespace: {HIT: 0, MISS: 0}
+        for namespace in NAMESPACES
+    }
+    for key, value in counters.items():
+        namespace, kind = keys[key]
+        result[namespace][kind] = value
+    for counter in result.values():
+        total = counter[HIT] + counter[MISS]
+        counter['hit_ratio'] = counter[HIT] / total if total else None
+    return result
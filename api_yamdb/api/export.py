@@ -0,0 +1,45 @@
+"""Потоковая выгрузка произведений с отзывами в NDJSON.
+
+Произведения читаются курсором пачками по chunk_size, жанры и отзывы
+догружаются одним запросом на пачку, поэтому память не растет
+с размером каталога.
+"""
+from itertools import islice
+
+from django.db.models import Prefetch, prefetch_related_objects
+from rest_framework.utils.encoders import JSONEncoder
+
+from reviews.models import Genre, Review
+from .serializers import ReviewSerializer, TitleReadSerializer
+
+CONTENT_TYPE = 'application/x-ndjson'
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_titles(queryset, chunk_size):
+    """Строки NDJSON: произведение в формате TitleReadSerializer
+    и его отзывы в формате ReviewSerializer"""
+    encoder = JSONEncoder(ensure_ascii=False)
+    # Жанры по pk, как в списке и карточке произведения
+    genres = Prefetch('genre', queryset=Genre.objects.order_by('pk'))
+    reviews = Prefetch(
+        'reviews',
+        queryset=Review.objects.select_related('author').order_by('pk'))
+    # iterator() в Django 3.2 игнорирует prefetch_related, догружаем сами
+    titles = (queryset.select_related('category').prefetch_related(None)
+              .order_by('pk').iterator(chunk_size=chunk_size))
+    for batch in _batches(titles, chunk_size):
+        prefetch_related_objects(batch, genres, reviews)
+        for title in batch:
+            data = TitleReadSerializer(title).data
+            data['reviews'] = ReviewSerializer(
+                title.reviews.all(), many=True).data
+            yield encoder.encode(data) + '\n'
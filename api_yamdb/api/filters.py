@@ -1,12 +1,76 @@
+from django.db.models import F, Q
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 
 from reviews.models import Title
+from reviews.search import search_titles
+
+
+class SlugsFilter(filters.BaseInFilter, filters.CharFilter):
+    """Список slug через запятую"""
+
+
+def with_genres(slugs):
+    """Произведения хотя бы с одним из жанров, без дублей от JOIN.
+
+    id произведений берутся подзапросом IN по индексу (genre_id,
+    title_id) промежуточной таблицы, дальше - по первичному ключу.
+    """
+    return Q(pk__in=Title.genre.through.objects.filter(
+        genre__slug__in=slugs).values('title_id'))
+
+
+# Сортировки списка произведений: у каждой свой индекс, добивка по pk
+# в том же направлении, чтобы индекс читался одним проходом. Без оценок
+# произведения идут в конце в обе стороны
+TITLE_ORDERINGS = {
+    'rating': (F('rating').asc(nulls_last=True), 'pk'),
+    '-rating': (F('rating').desc(nulls_last=True), '-pk'),
+    'year': ('year', 'pk'),
+    '-year': ('-year', '-pk'),
+    'name': ('name', 'pk'),
+    '-name': ('-name', '-pk'),
+}
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """?ordering= одним из TITLE_ORDERINGS.
+
+    Без параметра или с неизвестным значением порядок queryset не
+    меняется: по pk из Meta.ordering или по релевантности поиска.
+    """
+    ordering_fields = ('rating', 'year', 'name')
+
+    def get_ordering(self, request, queryset, view):
+        return TITLE_ORDERINGS.get(
+            request.query_params.get(self.ordering_param, '').strip())
 
 
 class TitleFilter(filters.FilterSet):
     category = filters.CharFilter(field_name='category__slug',)
-    genre = filters.CharFilter(field_name='genre__slug',)
+    genre = SlugsFilter(method='filter_any_genre')
+    genre_all = SlugsFilter(method='filter_all_genres')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'rating',
+                   'weighted_rating', 'modified')
+
+    def filter_any_genre(self, queryset, name, value):
+        """Хотя бы один из жанров: genre=drama,comedy"""
+        return queryset.filter(with_genres(value))
+
+    def filter_all_genres(self, queryset, name, value):
+        """Все жанры сразу: genre_all=drama,comedy"""
+        for slug in sorted(set(value)):
+            queryset = queryset.filter(with_genres((slug,)))
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию"""
+        return search_titles(queryset, value)
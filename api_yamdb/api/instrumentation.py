@@ -0,0 +1,196 @@
+"""Замеры времени запроса: SQL, сериализаторы, всего.
+
+PerformanceMiddleware считает запросы к БД и их время, время
+сериализаторов и полное время запроса. Итог уходит в заголовок
+Server-Timing и строкой JSON в лог api.performance, запросы дольше
+PERF_SLOW_QUERY_MS - в лог api.slow_queries вместе с SQL, параметрами
+и view.
+
+Замеры включаются на лету командой instrumentation on|off: флаг лежит
+в кэше, процесс перечитывает его не чаще раза в PERF_SWITCH_TTL секунд.
+Выключенные замеры стоят одного сравнения на запрос и одного чтения
+contextvar на вызов сериализатора.
+
+Запросы потокового ответа (выгрузка каталога) выполняются после
+выхода из middleware и в замер не попадают.
+"""
+import asyncio
+import json
+import logging
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger('api.performance')
+slow_logger = logging.getLogger('api.slow_queries')
+
+SWITCH_KEY = 'perf:enabled'
+
+_current = ContextVar('request_timings', default=None)
+_switch = {'value': False, 'checked': None}
+
+
+class Timings:
+    def __init__(self):
+        self.view = None
+        self.queries = 0
+        self.db_ms = 0.0
+        self.serializer_ms = 0.0
+        self.depth = 0
+
+
+def enabled():
+    now = monotonic()
+    checked = _switch['checked']
+    if checked is None or now - checked >= settings.PERF_SWITCH_TTL:
+        value = cache.get(SWITCH_KEY)
+        _switch['value'] = (
+            settings.PERF_INSTRUMENTATION if value is None else value)
+        _switch['checked'] = now
+    return _switch['value']
+
+
+def switch(value):
+    """Включает или выключает замеры во всех процессах"""
+    cache.set(SWITCH_KEY, bool(value), timeout=None)
+    _switch['checked'] = None
+
+
+def timed_serializer(method, *args):
+    """Время внешнего вызова сериализатора; вложенные уже внутри него"""
+    timings = _current.get()
+    if timings is None:
+        return method(*args)
+    timings.depth += 1
+    started = perf_counter()
+    try:
+        return method(*args)
+    finally:
+        timings.depth -= 1
+        if not timings.depth:
+            timings.serializer_ms += (perf_counter() - started) * 1000
+
+
+class TimedSerializerMixin:
+    """Учитывает время to_representation и run_validation в замере"""
+
+    def to_representation(self, instance):
+        return timed_serializer(super().to_representation, instance)
+
+    def run_validation(self, *args):
+        return timed_serializer(super().run_validation, *args)
+
+
+def view_name(request, view_func):
+    view = getattr(view_func, 'cls', view_func)
+    name = f'{view.__module__}.{view.__qualname__}'
+    action = (getattr(view_func, 'actions', None) or {}).get(
+        request.method.lower())
+    return f'{name}.{action}' if action else name
+
+
+@contextmanager
+def record_queries():
+    """Считает запросы соединений текущего потока в замер запроса.
+
+    Под ASGI представление выполняется в другом потоке, поэтому обертка
+    api.asynchronous входит сюда уже в нем.
+    """
+    timings = _current.get()
+    with ExitStack() as stack:
+        if timings is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(
+                    QueryRecorder(timings)))
+        yield
+
+
+class PerformanceMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django распознает async-режим, как у MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not enabled():
+            return self.get_response(request)
+        timings, started = Timings(), perf_counter()
+        token = _current.set(timings)
+        try:
+            with record_queries():
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        if not enabled():
+            return await self.get_response(request)
+        timings, started = Timings(), perf_counter()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, started)
+
+    def finish(self, request, response, timings, started):
+        total_ms = (perf_counter() - started) * 1000
+        response['Server-Timing'] = server_timing(timings, total_ms)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'view': timings.view,
+            'queries': timings.queries,
+            'db_ms': round(timings.db_ms, 2),
+            'serializer_ms': round(timings.serializer_ms, 2),
+            'total_ms': round(total_ms, 2),
+        }, ensure_ascii=False))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _current.get()
+        if timings is not None:
+            timings.view = view_name(request, view_func)
+
+
+class QueryRecorder:
+
+    def __init__(self, timings):
+        self.timings = timings
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (perf_counter() - started) * 1000
+            self.timings.queries += 1
+            self.timings.db_ms += duration
+            if duration >= settings.PERF_SLOW_QUERY_MS:
+                slow_logger.warning(json.dumps({
+                    'duration_ms': round(duration, 2),
+                    'view': self.timings.view,
+                    'sql': sql,
+                    'params': params,
+                }, ensure_ascii=False, default=str))
+
+
+def server_timing(timings, total_ms):
+    return (
+        f'db;dur={timings.db_ms:.2f};desc="{timings.queries} queries", '
+        f'serializer;dur={timings.serializer_ms:.2f}, '
+        f'total;dur={total_ms:.2f}'
+    )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api import instrumentation
+
+STATES = {'on': True, 'off': False}
+
+
+class Command(BaseCommand):
+    help = ('Включает или выключает замеры запросов (Server-Timing, '
+            'лог api.performance и медленных запросов) во всех процессах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'state', nargs='?', choices=('on', 'off', 'status'),
+            default='status')
+
+    def handle(self, *args, **options):
+        if options['state'] != 'status':
+            instrumentation.switch(STATES[options['state']])
+        self.stdout.write(
+            'Замеры включены' if instrumentation.enabled()
+            else 'Замеры выключены')
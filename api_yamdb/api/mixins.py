@@ -1,7 +1,20 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import prefetch_related_objects
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin, RetrieveModelMixin,)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import GenericViewSet
 
+from . import cache, instrumentation, rows, sparse
+
 
 class CreateListDestroyMixinSet(CreateModelMixin, ListModelMixin,
                                 DestroyModelMixin, GenericViewSet):
@@ -12,3 +25,268 @@ class CreateUserMixinSet(CreateModelMixin, ListModelMixin,
                          RetrieveModelMixin, DestroyModelMixin,
                          GenericViewSet):
     pass
+
+
+class CachedListMixin:
+    """Отдает list() из кэша, пока не изменились версии cache_dependencies.
+
+    Кэшируются данные ответа, а не байты, поэтому формат по-прежнему
+    выбирается по заголовку Accept.
+    """
+    cache_namespace = None
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        key = cache.make_key(
+            self.cache_namespace, request, self.cache_dependencies)
+        data = cache.load(key)
+        if data is not None:
+            cache.record(self.cache_namespace, cache.HIT)
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = super().list(request, *args, **kwargs)
+        cache.record(self.cache_namespace, cache.MISS)
+        if response.status_code == 200:
+            cache.save(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class SparseFieldsMixin:
+    """?fields= и ?omit= для list() и retrieve() (api/sparse.py)"""
+    sparse_actions = ('list', 'retrieve')
+    # Колонки, которые нужны помимо полей ответа
+    sparse_required = ()
+
+    def get_sparse_fields(self):
+        """Поля сериализатора, которые остаются в ответе; None - все"""
+        if self.action not in self.sparse_actions:
+            return None
+        if not hasattr(self, '_sparse_fields'):
+            fields = self.get_serializer_class()(
+                context=self.get_serializer_context()).fields
+            names = sparse.selected(self.request, fields)
+            self._sparse_fields = None if names is None else {
+                name: field for name, field in fields.items()
+                if name in names}
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            sparse.trim_serializer(serializer, fields)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        return self.trim_queryset(super().filter_queryset(queryset))
+
+    def trim_queryset(self, queryset, required=()):
+        """Выборка только под поля ответа; для объектов, которые
+        читаются в обход filter_queryset()"""
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        return sparse.trim_queryset(
+            queryset, fields, (*self.sparse_required, *required))
+
+
+class RowListMixin:
+    """list() через values() и api/rows.py вместо сериализатора.
+
+    Включается настройкой FAST_LIST_SERIALIZATION; сериализатор с
+    полями, которые нельзя прочитать из values(), идет обычным путем.
+    Ставится вместе с SparseFieldsMixin: учитывает ?fields= и ?omit=
+    и колонки sparse_required.
+    """
+
+    def get_row_builder(self):
+        if not settings.FAST_LIST_SERIALIZATION:
+            return None
+        names = self.get_sparse_fields()
+        return rows.builder(
+            self.get_serializer_class(),
+            None if names is None else frozenset(names))
+
+    def list(self, request, *args, **kwargs):
+        builder = self.get_row_builder()
+        if builder is None:
+            return super().list(request, *args, **kwargs)
+        queryset = builder.queryset(
+            self.filter_queryset(self.get_queryset()), self.sparse_required)
+        page = self.paginate_queryset(queryset)
+        data = instrumentation.timed_serializer(
+            builder.build, queryset if page is None else page)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для list() и retrieve().
+
+    Валидаторы строятся из водяного знака изменений, а не из тела ответа:
+    при совпадении If-None-Match или If-Modified-Since сериализатор не
+    запускается и клиент получает 304.
+
+    View обязан определить get_watermark(): пару (метка версии, datetime
+    для Last-Modified или None). Метка None означает, что ресурса нет, и
+    запрос обрабатывается как обычно.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        assert hasattr(self, 'get_watermark'), (
+            f'{self.__class__.__name__} должен определить get_watermark()')
+        token, last_modified = self.get_watermark()
+        if token is None:
+            return handler(request, *args, **kwargs)
+        etag = quote_etag(md5('|'.join((
+            request.build_absolute_uri(),
+            request.accepted_renderer.format,
+            str(token),
+        )).encode()).hexdigest())
+        timestamp = last_modified and int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class BulkCreateMixin:
+    """POST со списком объектов вместо одного.
+
+    Все элементы проверяются вместе, прошедшие проверку пишутся через
+    bulk_create в одной транзакции, связи M2M - через bulk_create
+    промежуточной модели. В ответе на каждый элемент запроса свой
+    результат: данные созданного объекта или ошибки.
+
+    Если запись нарушила ограничение БД (параллельный запрос успел
+    раньше), элементы пишутся по одному, и ошибку bulk_conflict_errors
+    получают только те, что нарушили его.
+    """
+    bulk_conflict_errors = {api_settings.NON_FIELD_ERRORS_KEY: [
+        'Объект конфликтует с уже существующим']}
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        limit = settings.BULK_CREATE_MAX_ITEMS
+        if not 0 < len(request.data) <= limit:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f'Ожидается список от 1 до {limit} объектов']})
+        context = dict(self.get_serializer_context(),
+                       **self.get_bulk_context(request.data))
+        serializers = [self.get_serializer(data=item, context=context)
+                       for item in request.data]
+        valid = [serializer for serializer in serializers
+                 if serializer.is_valid()]
+        rejected = self.validate_bulk(valid)
+        valid = [serializer for serializer in valid
+                 if serializer not in rejected]
+        if valid:
+            try:
+                with transaction.atomic():
+                    self.perform_bulk_create(valid)
+            except IntegrityError:
+                conflicts = self.perform_bulk_create_each(valid)
+                rejected.update(conflicts)
+                valid = [serializer for serializer in valid
+                         if serializer not in conflicts]
+        created = set(valid)
+        results = [
+            {'status': status.HTTP_201_CREATED, 'data': serializer.data}
+            if serializer in created else
+            {'status': status.HTTP_400_BAD_REQUEST,
+             'errors': rejected.get(serializer, serializer.errors)}
+            for serializer in serializers
+        ]
+        if len(valid) == len(serializers):
+            code = status.HTTP_201_CREATED
+        elif valid:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+        return Response(results, status=code)
+
+    def get_bulk_context(self, items):
+        """Дополнительный контекст сериализаторов, общий для всех
+        элементов: например, заранее загруженные связанные объекты"""
+        return {}
+
+    def validate_bulk(self, serializers):
+        """Проверки, которым нужна БД: {сериализатор: ошибки}"""
+        return {}
+
+    def get_bulk_save_kwargs(self):
+        """Поля, которые perform_create передает в save()"""
+        return {}
+
+    def perform_bulk_create(self, serializers):
+        model = serializers[0].Meta.model
+        extra = self.get_bulk_save_kwargs()
+        objs, links = [], []
+        for serializer in serializers:
+            data = dict(serializer.validated_data, **extra)
+            related = {
+                name: data.pop(name) for name in list(data)
+                if model._meta.get_field(name).many_to_many
+            }
+            serializer.instance = model(**data)
+            objs.append(serializer.instance)
+            links.append(related)
+        bulk_insert(model, objs)
+        names = set()
+        for obj, related in zip(objs, links):
+            names.update(related)
+        for name in names:
+            field = model._meta.get_field(name)
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            # Повторы в списке, как и в set(), дают одну связь
+            field.remote_field.through.objects.bulk_create([
+                field.remote_field.through(**{source: obj.pk, target: pk})
+                for obj, related in zip(objs, links)
+                for pk in dict.fromkeys(
+                    value.pk for value in related.get(name, ()))
+            ])
+        # Данные ответа читают M2M: одним запросом на все объекты
+        prefetch_related_objects(objs, *names)
+        self.after_bulk_create(objs)
+
+    def perform_bulk_create_each(self, serializers):
+        """Запись по одному элементу: {сериализатор: ошибки} конфликтов"""
+        conflicts = {}
+        for serializer in serializers:
+            try:
+                with transaction.atomic():
+                    self.perform_bulk_create([serializer])
+            except IntegrityError:
+                conflicts[serializer] = self.bulk_conflict_errors
+        return conflicts
+
+    def after_bulk_create(self, objs):
+        """То, что perform_create делает после сохранения объекта"""
+
+
+def bulk_insert(model, objs):
+    """bulk_create, если БД возвращает id вставленных строк.
+
+    Иначе (SQLite в Django 3.2) строки вставляются по одной в той же
+    транзакции: без id не построить связи и ответ.
+    """
+    connection = connections[model.objects.db]
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objs)
+    for obj in objs:
+        obj.save(force_insert=True)
+    return objs
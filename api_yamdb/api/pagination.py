@@ -0,0 +1,128 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       LimitOffsetPagination)
+
+
+class PubDateKeysetPagination(CursorPagination):
+    """Keyset-пагинация по паре (pub_date, pk).
+
+    Курсор хранит pub_date и pk крайней записи страницы, следующая
+    страница выбирается условием по этой паре, без OFFSET и COUNT(*),
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    """
+    ordering = ('-pub_date', '-pk')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    separator = '|'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.cursor.position if self.cursor else None
+
+        if reverse:
+            queryset = queryset.order_by('pub_date', 'pk')
+        else:
+            queryset = queryset.order_by('-pub_date', '-pk')
+        if position is not None:
+            queryset = self.seek(queryset, position, reverse)
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.display_page_controls = self.has_next or self.has_previous
+        return self.page
+
+    def seek(self, queryset, position, reverse):
+        """Условие (pub_date, pk) < позиции (или > для обратного хода).
+
+        Граница по pub_date попадает в условие индекса, а проверка pk
+        нужна только для записей с одинаковым pub_date.
+        """
+        pub_date, pk = self.decode_position(position)
+        if reverse:
+            return queryset.filter(pub_date__gte=pub_date).filter(
+                Q(pub_date__gt=pub_date) | Q(pk__gt=pk))
+        return queryset.filter(pub_date__lte=pub_date).filter(
+            Q(pub_date__lt=pub_date) | Q(pk__lt=pk))
+
+    def decode_position(self, position):
+        try:
+            pub_date, pk = position.rsplit(self.separator, 1)
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk
+
+    def _get_position_from_instance(self, instance, ordering=None):
+        if isinstance(instance, dict):
+            pub_date, pk = instance['pub_date'], instance['id']
+        else:
+            pub_date, pk = instance.pub_date, instance.pk
+        return f'{pub_date.isoformat()}{self.separator}{pk}'
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1])
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[0])
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position))
+
+
+class OffsetOrKeysetPagination(LimitOffsetPagination):
+    """limit/offset по умолчанию, keyset при параметре cursor.
+
+    Пустой cursor (?cursor=) открывает первую страницу в режиме keyset.
+    """
+    keyset_class = PubDateKeysetPagination
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.keyset_class.cursor_query_param not in request.query_params:
+            self.keyset = None
+            return super().paginate_queryset(queryset, request, view)
+        self.keyset = self.keyset_class()
+        page = self.keyset.paginate_queryset(queryset, request, view)
+        self.display_page_controls = self.keyset.display_page_controls
+        return page
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.keyset is not None:
+            return self.keyset.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
@@ -0,0 +1,57 @@
+"""Родительские объекты вложенных маршрутов titles/reviews/comments.
+
+Произведение, отзыв и комментарий читаются один раз за запрос: объект
+вместе со всеми родителями одним запросом с JOIN. Прочитанное хранится
+на request, так что views, сериализаторы и права доступа получают те
+же экземпляры без повторных запросов. Объект, не принадлежащий
+родителю из URL, как и нечисловой id, дает 404.
+
+Отзыв и комментарий можно читать из урезанной выборки (queryset), в
+которой она сама должна оставить select_related родителей.
+"""
+from rest_framework.generics import get_object_or_404
+
+from reviews.models import Comment, Review, Title
+
+REVIEWS = Review.objects.select_related('title', 'author')
+COMMENTS = Comment.objects.select_related('review__title', 'author')
+
+
+def _parents(request):
+    try:
+        return request._parents
+    except AttributeError:
+        request._parents = {}
+        return request._parents
+
+
+def get_title(request, title_id):
+    parents = _parents(request)
+    if 'title' not in parents:
+        parents['title'] = get_object_or_404(Title, pk=title_id)
+    return parents['title']
+
+
+def get_review(request, title_id, review_id, queryset=REVIEWS):
+    """Отзыв произведения title_id вместе с произведением и автором"""
+    parents = _parents(request)
+    if 'review' not in parents:
+        review = get_object_or_404(
+            queryset, pk=review_id, title_id=title_id)
+        parents['review'] = review
+        parents.setdefault('title', review.title)
+    return parents['review']
+
+
+def get_comment(request, title_id, review_id, comment_id,
+                queryset=COMMENTS):
+    """Комментарий к отзыву review_id произведения title_id"""
+    parents = _parents(request)
+    if 'comment' not in parents:
+        comment = get_object_or_404(
+            queryset, pk=comment_id, review_id=review_id,
+            review__title_id=title_id)
+        parents['comment'] = comment
+        parents.setdefault('review', comment.review)
+        parents.setdefault('title', comment.review.title)
+    return parents['comment']
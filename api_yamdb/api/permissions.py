@@ -30,7 +30,7 @@ class IsAuthorOrAdministratorOrReadOnly(permissions.BasePermission):
         """Ограничения на уровне объекта"""
         return (
             request.method in permissions.SAFE_METHODS
-            or obj.author == request.user
+            or obj.author_id == request.user.id
             or request.user.is_admin
             or request.user.is_moderator
         )
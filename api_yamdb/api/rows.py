@@ -0,0 +1,160 @@
+"""Быстрый путь list(): словари из values() без экземпляров моделей.
+
+ModelSerializer на каждый элемент списка создает экземпляр модели,
+обходит поля через get_attribute и собирает OrderedDict. Здесь поля
+сериализатора один раз разбираются в план: какую колонку values()
+читать и каким to_representation поля ее преобразовать. Вложенные
+объекты по внешнему ключу читаются тем же запросом через JOIN, списки
+по ManyToMany - одним запросом на страницу, как prefetch_related.
+
+Преобразования значений делают те же поля DRF, поэтому ответ совпадает
+с ответом сериализатора байт в байт. Поля, которые план не умеет
+читать (source='*', вложенный путь, гиперссылки, обратные связи),
+отключают быстрый путь для сериализатора целиком.
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+class Unsupported(Exception):
+    """Поле нельзя прочитать из values()"""
+
+
+def _same(value):
+    return value
+
+
+def _leaf(model, field, prefix=''):
+    """(колонка values(), преобразование) простого поля"""
+    if isinstance(field, ManyRelatedField):
+        raise Unsupported(field)
+    if isinstance(field, serializers.SlugRelatedField):
+        return f'{prefix}{field.source}__{field.slug_field}', _same
+    if isinstance(field, (RelatedField, serializers.BaseSerializer)):
+        raise Unsupported(field)
+    try:
+        model_field = model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        raise Unsupported(field)
+    if model_field.is_relation:
+        raise Unsupported(field)
+    return prefix + model_field.attname, field.to_representation
+
+
+def _leaves(model, fields, prefix=''):
+    return [(name, *_leaf(model, field, prefix))
+            for name, field in fields.items()]
+
+
+class Many:
+    """Списки вложенных объектов по ManyToMany, в порядке их pk"""
+
+    def __init__(self, model_field, serializer):
+        through = model_field.remote_field.through._meta
+        self.owner = through.get_field(
+            model_field.m2m_field_name()).attname
+        target = through.get_field(model_field.m2m_reverse_field_name())
+        self.leaves = _leaves(
+            model_field.related_model, serializer.fields, f'{target.name}__')
+        self.queryset = through.model.objects.order_by(
+            target.attname).values_list(
+                self.owner, *(column for _, column, _ in self.leaves))
+
+    def load(self, ids):
+        items = {}
+        for owner_id, *values in self.queryset.filter(
+                **{f'{self.owner}__in': ids}):
+            items.setdefault(owner_id, []).append({
+                name: None if value is None else convert(value)
+                for (name, _, convert), value in zip(self.leaves, values)
+            })
+        return items
+
+
+VALUE, ONE, MANY = 'value', 'one', 'many'
+
+
+class RowBuilder:
+    """План сборки ответа сериализатора из строк values()"""
+
+    def __init__(self, model, fields):
+        self.pk = model._meta.pk.attname
+        self.columns = [self.pk]
+        # (имя, вид, колонка, преобразование или вложенные поля)
+        self.plan = []
+        self.many = {}
+        for name, field in fields.items():
+            if '.' in field.source or field.source == '*':
+                raise Unsupported(field)
+            if isinstance(field, serializers.ListSerializer):
+                self.add_many(model, name, field)
+            elif isinstance(field, serializers.Serializer):
+                self.add_one(model, name, field)
+            else:
+                column, convert = _leaf(model, field)
+                self.columns.append(column)
+                self.plan.append((name, VALUE, column, convert))
+
+    def add_one(self, model, name, field):
+        model_field = model._meta.get_field(field.source)
+        if not (model_field.many_to_one or model_field.one_to_one):
+            raise Unsupported(field)
+        leaves = _leaves(
+            model_field.related_model, field.fields, f'{field.source}__')
+        self.columns.append(model_field.attname)
+        self.columns.extend(column for _, column, _ in leaves)
+        self.plan.append((name, ONE, model_field.attname, leaves))
+
+    def add_many(self, model, name, field):
+        model_field = model._meta.get_field(field.source)
+        if not model_field.many_to_many or not model_field.concrete:
+            raise Unsupported(field)
+        self.many[name] = Many(model_field, field.child)
+        self.plan.append((name, MANY, self.pk, None))
+
+    def queryset(self, queryset, extra=()):
+        """Строки для плана; extra - колонки, нужные помимо ответа"""
+        return queryset.prefetch_related(None).values(
+            *dict.fromkeys((*self.columns, *extra)))
+
+    def build(self, rows):
+        rows = list(rows)
+        ids = [row[self.pk] for row in rows]
+        many = {name: nested.load(ids) for name, nested in self.many.items()}
+        return [self.item(row, many) for row in rows]
+
+    def item(self, row, many):
+        item = {}
+        for name, kind, column, convert in self.plan:
+            value = row[column]
+            if kind == MANY:
+                item[name] = many[name].get(value, [])
+            elif value is None:
+                item[name] = None
+            elif kind == ONE:
+                item[name] = {
+                    leaf: None if row[key] is None else function(row[key])
+                    for leaf, key, function in convert
+                }
+            else:
+                item[name] = convert(value)
+        return item
+
+
+@lru_cache(maxsize=None)
+def builder(serializer_class, names=None):
+    """RowBuilder для полей names сериализатора или None.
+
+    Поля берутся у сериализатора без контекста: план кэшируется на
+    процесс, а поля, которым нужен запрос, и так не поддерживаются.
+    """
+    serializer = serializer_class()
+    fields = {name: field for name, field in serializer.fields.items()
+              if names is None or name in names}
+    try:
+        return RowBuilder(serializer.Meta.model, fields)
+    except Unsupported:
+        return None
@@ -1,5 +1,3 @@
-from django.core.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers, exceptions
 from rest_framework.validators import UniqueValidator
 
@@ -9,10 +7,11 @@ from reviews.models import Category, Genre, Title, Review, Comment
 from api_yamdb.settings import (NOT_MI_NAME,
                                 NO_NAME,
                                 RESERVED_NAME)
+from .instrumentation import TimedSerializerMixin
 from .utils import validate_users
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(
         required=True,
         max_length=150,
@@ -24,7 +23,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ForUserSerializer(serializers.Serializer):
+class ForUserSerializer(TimedSerializerMixin, serializers.Serializer):
     email = serializers.EmailField(max_length=254, required=True)
     username = serializers.CharField(
         required=True,
@@ -58,7 +57,7 @@ class ForUserSerializer(serializers.Serializer):
         return user
 
 
-class ForAdminSerializer(serializers.ModelSerializer):
+class ForAdminSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Если имя уже есть в базе то выводим исключение.
     Сериализатор для Admin"""
 
@@ -81,12 +80,12 @@ class ForAdminSerializer(serializers.ModelSerializer):
         return validate_users(self, data)
 
 
-class ConfirmationCodeSerializer(serializers.Serializer):
+class ConfirmationCodeSerializer(TimedSerializerMixin, serializers.Serializer):
     username = serializers.CharField(max_length=150)
     confirmation_code = serializers.CharField()
 
 
-class TokenSerializer(serializers.Serializer):
+class TokenSerializer(TimedSerializerMixin, serializers.Serializer):
     """Генерируем токен"""
     username = serializers.CharField(max_length=200, required=True)
     confirmation_code = serializers.CharField(max_length=200, required=True)
@@ -94,50 +93,86 @@ class TokenSerializer(serializers.Serializer):
     def validate_username(self, value):
         if value == RESERVED_NAME:
             raise serializers.ValidationError(NOT_MI_NAME)
-        if not User.objects.filter(username=value).exists():
-            raise exceptions.NotFound(NO_NAME)
         return value
 
+    def validate(self, data):
+        """Пользователь читается один раз и передается во view"""
+        data['user'] = User.objects.filter(
+            username=data['username']).first()
+        if data['user'] is None:
+            raise exceptions.NotFound(NO_NAME)
+        return data
+
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         exclude = ('id',)
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         exclude = ('id',)
         model = Genre
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Отдельный сериализатор для произведений, только на чтение"""
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'weighted_rating',
+                   'modified')
         model = Title
 
 
-class TitleWriteSerializer(serializers.ModelSerializer):
+class TopTitleSerializer(TitleReadSerializer):
+    """Произведение в списке лучших: с байесовским рейтингом"""
+    weighted_rating = serializers.FloatField(read_only=True)
+
+    class Meta(TitleReadSerializer.Meta):
+        exclude = ('rating_sum', 'rating_count', 'modified')
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """Ищет объект в context['preloaded'][модель], если модель там есть.
+
+    Так список произведений проверяется без запроса на каждый slug.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(
+            self.queryset.model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            return preloaded[data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=data)
+        except TypeError:
+            self.fail('invalid')
+
+
+class TitleWriteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Отдельный сериализатор для записей"""
-    category = serializers.SlugRelatedField(queryset=Category.objects.all(),
-                                            slug_field='slug'
-                                            )
-    genre = serializers.SlugRelatedField(queryset=Genre.objects.all(),
-                                         slug_field='slug',
-                                         many=True
+    category = PreloadedSlugRelatedField(queryset=Category.objects.all(),
+                                         slug_field='slug'
                                          )
+    genre = PreloadedSlugRelatedField(queryset=Genre.objects.all(),
+                                      slug_field='slug',
+                                      many=True
+                                      )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'rating',
+                   'weighted_rating', 'modified')
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -146,20 +181,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
         model = Review
 
-    def validate(self, data):
-        request = self.context['request']
-        author = request.user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if (
-            request.method == 'POST'
-            and Review.objects.filter(title=title, author=author).exists()
-        ):
-            raise ValidationError('Может существовать только один отзыв!')
-        return data
-
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
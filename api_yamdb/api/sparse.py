@@ -0,0 +1,122 @@
+"""Выборочные поля ответа: ?fields=id,name и ?omit=description.
+
+Из сериализатора убираются лишние поля, из SELECT - их колонки
+(only()), а связи без полей в ответе не догружаются: select_related
+и prefetch_related для них снимаются.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _names(request, param):
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def selected(request, available):
+    """Поля ответа по параметрам запроса; None - все поля"""
+    fields, omit = _names(request, FIELDS_PARAM), _names(request, OMIT_PARAM)
+    if fields is None and omit is None:
+        return None
+    errors = {}
+    for param, names in ((FIELDS_PARAM, fields), (OMIT_PARAM, omit)):
+        unknown = [name for name in names or () if name not in available]
+        if unknown:
+            errors[param] = [f'Неизвестные поля: {", ".join(unknown)}']
+    if errors:
+        raise ValidationError(errors)
+    names = set(available if fields is None else fields)
+    return names.difference(omit or ())
+
+
+def trim_serializer(serializer, names):
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    for name in set(serializer.fields).difference(names):
+        serializer.fields.pop(name)
+    return serializer
+
+
+def _related_columns(field, related_model):
+    """Колонки связанной модели, которые выводит поле, или None - все"""
+    if isinstance(field, serializers.SlugRelatedField):
+        sources = [field.slug_field]
+    elif isinstance(field, serializers.Serializer):
+        sources = [child.source for child in field.fields.values()]
+    else:
+        return None
+    try:
+        for source in sources:
+            if related_model._meta.get_field(source).is_relation:
+                return None
+    except FieldDoesNotExist:
+        return None
+    return sources
+
+
+def _select_paths(tree, prefix=''):
+    for name, children in tree.items():
+        path = prefix + name
+        if children:
+            yield from _select_paths(children, path + '__')
+        else:
+            yield path
+
+
+def _columns(opts, fields, select):
+    """Колонки модели и имена связей, которые читают поля fields"""
+    columns, relations = {opts.pk.name}, set()
+    for field in fields.values():
+        source = field.source.split('.')[0]
+        try:
+            model_field = opts.get_field(source)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            columns.add(model_field.name)
+            continue
+        relations.add(source)
+        if not model_field.concrete or model_field.many_to_many:
+            continue
+        columns.add(source)
+        related = _related_columns(
+            getattr(field, 'child', field), model_field.related_model)
+        if source in select and related:
+            columns.update(f'{source}__{name}' for name in related)
+    return columns, relations
+
+
+def trim_queryset(queryset, fields, required=()):
+    """Только колонки и связи, нужные полям fields сериализатора.
+
+    required - колонки, которые нужны помимо ответа, например для
+    курсора пагинации; колонка через связь (title__modified) оставляет
+    эту связь в select_related.
+    """
+    select = queryset.query.select_related
+    if select is True or any(
+            field.source == '*' for field in fields.values()):
+        return queryset
+    select = select or {}
+    columns, relations = _columns(queryset.model._meta, fields, select)
+    relations.update(name.split('__')[0] for name in required if '__' in name)
+    # Связанный менеджер (title.reviews) проставляет родителя по его id
+    columns.update(field.name for field in queryset._known_related_objects)
+    paths = [path for path in _select_paths(select)
+             if path.split('__')[0] in relations]
+    queryset = queryset.select_related(None)
+    if paths:
+        queryset = queryset.select_related(*paths)
+    lookups = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if getattr(lookup, 'prefetch_through', lookup).split('__')[0]
+        in relations
+    ]
+    return queryset.prefetch_related(None).prefetch_related(
+        *lookups).only(*columns, *required)
@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from api.views import UserAdmin, TokenAPI, SignUpAPI
+from api.views import (UserAdmin, TokenAPI, SignUpAPI, ResponseCacheStatsAPI,
+                       OutboxStatsAPI)
 from .views import (
     CategoryViewSet,
     GenreViewSet,
@@ -27,5 +28,9 @@ router_v1.register(
 urlpatterns = [
     path('v1/auth/signup/', SignUpAPI.as_view(), name='signup'),
     path('v1/auth/token/', TokenAPI.as_view(), name='token'),
+    path('v1/cache/stats/', ResponseCacheStatsAPI.as_view(),
+         name='cache-stats'),
+    path('v1/outbox/stats/', OutboxStatsAPI.as_view(),
+         name='outbox-stats'),
     path('v1/', include(router_v1.urls)),
 ]
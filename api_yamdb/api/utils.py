@@ -1,3 +1,4 @@
+from django.db.models import Q
 from rest_framework import serializers
 
 from users.models import User
@@ -5,17 +6,23 @@ from api_yamdb.settings import RESERVED_NAME
 
 
 def validate_users(self, data):
-    if_username = User.objects.filter(username=data.get('username'))
-    if_email = User.objects.filter(email=data.get('email'))
-    if User.objects.filter(username=data.get('username'),
-                           email=data.get('email')).exists():
-        return data
-    if if_email:
-        raise serializers.ValidationError(f'Почта {if_email}'
-                                          f'уже использовалась')
-    if if_username:
-        raise serializers.ValidationError(f'Имя {if_username}'
-                                          f'уже использовалось')
-    if str(data.get('username')).lower() == RESERVED_NAME:
+    """Проверяет имя и почту одним запросом по уникальным индексам.
+
+    Если пользователь с такой парой уже есть, он сохраняется
+    в self.existing_user.
+    """
+    username, email = data.get('username'), data.get('email')
+    self.existing_user = None
+    users = list(
+        User.objects.filter(Q(username=username) | Q(email=email))[:2])
+    for user in users:
+        if (user.username, user.email) == (username, email):
+            self.existing_user = user
+            return data
+    if any(user.email == email for user in users):
+        raise serializers.ValidationError(f'Почта {email} уже использовалась')
+    if users:
+        raise serializers.ValidationError(f'Имя {username} уже использовалось')
+    if str(username).lower() == RESERVED_NAME:
         raise serializers.ValidationError('Нельзя использовать имя me')
     return data
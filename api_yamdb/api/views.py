@@ -1,32 +1,47 @@
-from django.db.models import Avg
-from django.core.mail import send_mail
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.tokens import default_token_generator
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, viewsets, status
 from rest_framework.filters import SearchFilter
 
 from api_yamdb.settings import DEFAULT_FROM_EMAIL
+from users import outbox, tokens
 from users.models import User
+from reviews import ratings, versions
 from reviews.models import Category, Genre, Title, Review
 from .serializers import (
     CategorySerializer, ForAdminSerializer,
     GenreSerializer, ForUserSerializer,
-    TitleReadSerializer, UserSerializer,
+    TitleReadSerializer, TopTitleSerializer, UserSerializer,
     TitleWriteSerializer, TokenSerializer,
     ReviewSerializer, CommentSerializer
 )
-from .mixins import CreateListDestroyMixinSet
+from . import cache, export, parents
+from .mixins import (
+    BulkCreateMixin, CachedListMixin, ConditionalGetMixin,
+    CreateListDestroyMixinSet, RowListMixin, SparseFieldsMixin
+)
 from .permissions import (
     IsAuthorOrAdministratorOrReadOnly,
     IsAdminOrReadOnly, IsAdmin
 )
-from .filters import TitleFilter
+from .filters import TitleFilter, TitleOrderingFilter, with_genres
+from .pagination import OffsetOrKeysetPagination
+
+DUPLICATE_REVIEW = {
+    api_settings.NON_FIELD_ERRORS_KEY: [
+        'Может существовать только один отзыв!']
+}
 
 
 class SignUpAPI(APIView):
@@ -38,21 +53,35 @@ class SignUpAPI(APIView):
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data.get('username')
         email = serializer.validated_data.get('email')
-        user, created = User.objects.get_or_create(username=username,
-                                                   email=email)
-        self.generating_confirmation_code_email(request, user)
+        # Пользователь и письмо в очереди сохраняются вместе
+        with transaction.atomic():
+            user = (serializer.existing_user
+                    or self.create_user(username, email))
+            self.generating_confirmation_code_email(request, user)
         return Response({'email': email, 'username': username})
 
-    def generating_confirmation_code_email(self, request, username):
-        email = request.data.get('email')
-        user = get_object_or_404(User, username=username)
+    @staticmethod
+    def create_user(username, email):
+        """Гонку двух регистраций разрешают уникальные индексы БД"""
+        try:
+            with transaction.atomic():
+                return User.objects.create(username=username, email=email)
+        except IntegrityError:
+            user = User.objects.filter(
+                username=username, email=email).first()
+            if user is None:
+                raise ValidationError(
+                    'Имя или почта уже использовались')
+            return user
+
+    def generating_confirmation_code_email(self, request, user):
+        """Письмо уходит через очередь, запрос не ждет SMTP"""
         confirmation_code = default_token_generator.make_token(user)
-        send_mail(
+        outbox.enqueue(
+            user.email,
             'Confirmation code',
             f'{confirmation_code}',
             f'{DEFAULT_FROM_EMAIL}',
-            [f'{email}'],
-            fail_silently=False,
         )
 
 
@@ -65,15 +94,12 @@ class TokenAPI(APIView):
 
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = get_object_or_404(
-            User,
-            username=serializer.validated_data['username']
-        )
+        user = serializer.validated_data['user']
         if default_token_generator.check_token(
             user,
             serializer.validated_data['confirmation_code']
         ):
-            token = AccessToken.for_user(user)
+            token = tokens.RoleAccessToken.for_user(user)
             return Response(
                 {'token': str(token)},
                 status=status.HTTP_200_OK
@@ -84,7 +110,7 @@ class TokenAPI(APIView):
         )
 
 
-class UserAdmin(viewsets.ModelViewSet):
+class UserAdmin(SparseFieldsMixin, viewsets.ModelViewSet):
     """Работа с пользователями для администратора"""
     queryset = User.objects.all()
     serializer_class = ForAdminSerializer
@@ -95,6 +121,14 @@ class UserAdmin(viewsets.ModelViewSet):
     search_fields = ('username',)
     lookup_field = 'username'
 
+    def perform_destroy(self, instance):
+        """Отзывы пользователя удаляются каскадом, рейтинг пересчитываем"""
+        with transaction.atomic():
+            title_ids = set(
+                instance.reviews.values_list('title_id', flat=True))
+            instance.delete()
+            ratings.rebuild(title_ids)
+
     def get(self, request, *args, **kwargs):
         serializer = ForUserSerializer(request.user, many=False)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -105,10 +139,10 @@ class UserAdmin(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def me(self, request):
+        user = get_object_or_404(User, pk=request.user.id)
         if request.method == 'GET':
-            serializer = UserSerializer(self.request.user)
+            serializer = UserSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        user = get_object_or_404(User, username=self.request.user)
         serializer = UserSerializer(
             user, data=request.data, partial=True
         )
@@ -117,7 +151,26 @@ class UserAdmin(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class CategoryViewSet(CreateListDestroyMixinSet):
+class ResponseCacheStatsAPI(APIView):
+    """Попадания в кэш списков каталога"""
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(cache.stats())
+
+
+class OutboxStatsAPI(APIView):
+    """Очередь писем: глубина, задержка доставки и счетчики"""
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(outbox.stats())
+
+
+class CategoryViewSet(CachedListMixin, SparseFieldsMixin,
+                      CreateListDestroyMixinSet):
+    cache_namespace = versions.CATEGORIES
+    cache_dependencies = (versions.CATEGORIES,)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -126,7 +179,10 @@ class CategoryViewSet(CreateListDestroyMixinSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(CreateListDestroyMixinSet):
+class GenreViewSet(CachedListMixin, SparseFieldsMixin,
+                   CreateListDestroyMixinSet):
+    cache_namespace = versions.GENRES
+    cache_dependencies = (versions.GENRES,)
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -135,12 +191,17 @@ class GenreViewSet(CreateListDestroyMixinSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score'))
+class TitleViewSet(ConditionalGetMixin, CachedListMixin, BulkCreateMixin,
+                   RowListMixin, SparseFieldsMixin, viewsets.ModelViewSet):
+    cache_namespace = versions.TITLES
+    cache_dependencies = (
+        versions.TITLES, versions.CATEGORIES, versions.GENRES)
+    # Жанры по pk: в том же порядке их отдает api/rows.py
+    queryset = Title.objects.select_related('category').prefetch_related(
+        Prefetch('genre', queryset=Genre.objects.order_by('pk')))
     serializer_class = TitleReadSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitleFilter
 
     def get_serializer_class(self):
@@ -148,34 +209,233 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def get_watermark(self):
+        catalog = versions.get_versions(*self.cache_dependencies)
+        if self.action == 'list':
+            return catalog, None
+        try:
+            pk = int(self.kwargs[self.lookup_field])
+        except ValueError:
+            # 404 отдаст get_object()
+            return None, None
+        modified = Title.objects.filter(
+            pk=pk).values_list('modified', flat=True).first()
+        if modified is None:
+            return None, None
+        return (modified.isoformat(), catalog[1:]), None
+
+    @action(detail=False)
+    def top(self, request):
+        """Лучшие произведения по байесовскому рейтингу.
+
+        Чтение идет по индексу weighted_rating, стоимость зависит от
+        limit, а не от размера каталога.
+        """
+        try:
+            limit = min(int(request.query_params.get(
+                'limit', settings.TOP_TITLES_LIMIT)),
+                settings.TOP_TITLES_MAX_LIMIT)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise ValidationError({'limit': [
+                'Ожидается целое число больше нуля']})
+        titles = self.get_queryset().filter(rating_count__gt=0)
+        category = request.query_params.get('category')
+        if category:
+            titles = titles.filter(category__slug=category)
+        genre = request.query_params.get('genre')
+        if genre:
+            titles = titles.filter(with_genres((genre,)))
+        titles = titles.order_by('-weighted_rating', 'pk')[:limit]
+        return Response(TopTitleSerializer(titles, many=True).data)
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """Гистограмма оценок, среднее, медиана и число отзывов"""
+        return self.conditional(self.get_stats, request, pk)
+
+    def get_stats(self, request, pk):
+        try:
+            pk = int(pk)
+        except ValueError:
+            raise Http404
+        stats = ratings.stats(pk)
+        if not stats['count'] and not Title.objects.filter(pk=pk).exists():
+            raise Http404
+        return Response(stats)
+
+    def get_bulk_context(self, items):
+        """Категории и жанры всех элементов двумя запросами"""
+        slugs = {Category: set(), Genre: set()}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            slugs[Category].add(item.get('category'))
+            genres = item.get('genre')
+            if isinstance(genres, list):
+                slugs[Genre].update(genres)
+        return {'preloaded': {
+            model: model.objects.in_bulk(
+                [slug for slug in values if isinstance(slug, str)],
+                field_name='slug')
+            for model, values in slugs.items()
+        }}
+
+    def after_bulk_create(self, objs):
+        # bulk_create не отправляет post_save и m2m_changed
+        versions.bump(versions.TITLES)
+
+    @action(detail=False, permission_classes=(IsAdmin,))
+    def export(self, request):
+        """Все произведения с отзывами построчно в NDJSON"""
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            export.iter_titles(queryset, settings.EXPORT_CHUNK_SIZE),
+            content_type=export.CONTENT_TYPE)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(ConditionalGetMixin, BulkCreateMixin, RowListMixin,
+                    SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorOrAdministratorOrReadOnly,)
+    pagination_class = OffsetOrKeysetPagination
+    # Курсор keyset-пагинации берется из pub_date последнего отзыва
+    sparse_required = ('pub_date',)
+    bulk_conflict_errors = DUPLICATE_REVIEW
+
+    def get_title(self):
+        if self.lookup_field in self.kwargs:
+            return self.get_review().title
+        return parents.get_title(self.request, self.kwargs['title_id'])
+
+    def get_review(self):
+        # Водяной знак читает modified произведения
+        return parents.get_review(
+            self.request, self.kwargs['title_id'],
+            self.kwargs[self.lookup_field],
+            self.trim_queryset(parents.REVIEWS, ('title__modified',)))
+
+    def get_object(self):
+        review = self.get_review()
+        self.check_object_permissions(self.request, review)
+        return review
+
+    def get_watermark(self):
+        modified = self.get_title().modified
+        return modified.isoformat(), modified
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        serializer.save(author=self.request.user, title=title)
+        """Второй отзыв того же автора отсекает ограничение unique_review"""
+        title = self.get_title()
+        author = self.request.user.as_model()
+        try:
+            with transaction.atomic():
+                review = serializer.save(author=author, title=title)
+                ratings.add_score(review.title_id, review.score)
+        except IntegrityError:
+            if not Review.objects.filter(
+                    title=title, author=author).exists():
+                raise
+            raise ValidationError(DUPLICATE_REVIEW)
+
+    def get_bulk_save_kwargs(self):
+        return {'author': self.request.user.as_model(),
+                'title': self.get_title()}
+
+    def validate_bulk(self, serializers):
+        """У автора один отзыв на произведение: лишние отклоняются"""
+        if not serializers:
+            return {}
+        taken = Review.objects.filter(
+            title=self.get_title(), author_id=self.request.user.id
+        ).exists()
+        rejected = {}
+        for serializer in serializers:
+            if taken:
+                rejected[serializer] = DUPLICATE_REVIEW
+            taken = True
+        return rejected
+
+    def after_bulk_create(self, objs):
+        ratings.add_scores(
+            self.get_title().pk, [review.score for review in objs])
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old_score = self._lock_score(serializer.instance)
+            review = serializer.save()
+            if old_score is not None:
+                ratings.change_score(review.title_id, old_score, review.score)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            score = self._lock_score(instance)
+            instance.delete()
+            if score is not None:
+                ratings.remove_score(instance.title_id, score)
+
+    @staticmethod
+    def _lock_score(review):
+        """Актуальная оценка из БД под блокировкой строки отзыва"""
+        return (Review.objects.select_for_update()
+                .filter(pk=review.pk)
+                .values_list('score', flat=True)
+                .first())
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        new_queryset = title.reviews.all()
-        return new_queryset
+        return self.get_title().reviews.select_related('author')
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, BulkCreateMixin, RowListMixin,
+                     SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrAdministratorOrReadOnly,)
+    pagination_class = OffsetOrKeysetPagination
+    sparse_required = ('pub_date',)
+
+    def get_review(self):
+        if self.lookup_field in self.kwargs:
+            return self.get_comment().review
+        return parents.get_review(
+            self.request, self.kwargs['title_id'], self.kwargs['review_id'])
+
+    def get_comment(self):
+        return parents.get_comment(
+            self.request, self.kwargs['title_id'], self.kwargs['review_id'],
+            self.kwargs[self.lookup_field],
+            self.trim_queryset(
+                parents.COMMENTS, ('review__title__modified',)))
+
+    def get_object(self):
+        comment = self.get_comment()
+        self.check_object_permissions(self.request, comment)
+        return comment
+
+    def get_watermark(self):
+        modified = self.get_review().title.modified
+        return modified.isoformat(), modified
 
     def perform_create(self, serializer):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, pk=review_id)
-        serializer.save(author=self.request.user, review=review)
+        review = self.get_review()
+        serializer.save(
+            author=self.request.user.as_model(), review=review)
+        versions.touch_title(review.title_id)
+
+    def get_bulk_save_kwargs(self):
+        return {'author': self.request.user.as_model(),
+                'review': self.get_review()}
+
+    def after_bulk_create(self, objs):
+        versions.touch_title(self.get_review().title_id)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        versions.touch_title(self.get_review().title_id)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        versions.touch_title(self.get_review().title_id)
 
     def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, pk=review_id)
-        new_queryset = review.comments.all()
-        return new_queryset
+        return self.get_review().comments.select_related('author')
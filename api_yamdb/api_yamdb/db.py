@@ -0,0 +1,23 @@
+"""Постоянные соединения с БД.
+
+С CONN_MAX_AGE поток gunicorn держит соединение открытым между
+запросами. Django 3.2 не проверяет его перед повторным использованием,
+поэтому после перезапуска PostgreSQL или разрыва по таймауту первый
+запрос падал бы с ошибкой. Здесь в начале запроса соединение
+проверяется, и неработающее закрывается: запрос откроет новое.
+"""
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+
+
+def check_connections(**kwargs):
+    for connection in connections.all():
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
+
+
+def connect_health_checks():
+    if settings.DB_CONN_HEALTH_CHECKS:
+        request_started.connect(
+            check_connections, dispatch_uid='db-health-checks')
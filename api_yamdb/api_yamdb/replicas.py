@@ -0,0 +1,141 @@
+"""Чтение с реплик БД.
+
+Реплики задаются в DB_REPLICAS (см. settings.py) и попадают в
+DATABASE_REPLICAS как {алиас: вес}. ReplicaMiddleware разрешает чтение
+с реплики запросам GET и HEAD, ReplicaRouter отправляет туда их
+SELECT. Все записи, миграции и остальные запросы идут в default.
+
+После успешного изменяющего запроса клиент получает cookie на
+REPLICA_READ_AFTER_WRITE секунд: пока она жива, его чтения тоже идут
+в default, и он видит свою запись, даже если реплика отстает.
+
+Реплика выбирается случайно по весам при первом чтении в запросе и
+держится до его конца. Если к ней не удается подключиться, она
+исключается из выбора на REPLICA_RETRY_AFTER секунд, а запрос берет
+другую реплику или default.
+
+Локально реплику можно изобразить копией файла SQLite:
+
+    cp db.sqlite3 replica.sqlite3
+    DB_REPLICAS='{"replica": {"ENGINE": "django.db.backends.sqlite3",
+                  "NAME": "replica.sqlite3"}}'
+"""
+import asyncio
+import random
+from contextvars import ContextVar
+from time import monotonic
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+PIN_COOKIE = 'read_primary'
+SAFE_METHODS = ('GET', 'HEAD')
+
+_reads = ContextVar('replica_reads', default=None)
+_down = {}
+
+
+class ReplicaReads:
+    """Разрешение запроса читать с реплики; алиас выбирается лениво"""
+
+    def __init__(self):
+        self.alias = None
+
+    def database(self):
+        if self.alias is None:
+            self.alias = choose_replica() or DEFAULT_DB_ALIAS
+        return self.alias
+
+
+def usable(alias):
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        return False
+    return True
+
+
+def choose_replica():
+    """Реплика по весам среди доступных, None - читать из default"""
+    now = monotonic()
+    candidates = {
+        alias: weight
+        for alias, weight in settings.DATABASE_REPLICAS.items()
+        if weight > 0 and _down.get(alias, 0) <= now
+    }
+    while candidates:
+        alias = random.choices(
+            list(candidates), weights=list(candidates.values()))[0]
+        if usable(alias):
+            return alias
+        _down[alias] = now + settings.REPLICA_RETRY_AFTER
+        del candidates[alias]
+    return None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        reads = _reads.get()
+        if reads is None:
+            return DEFAULT_DB_ALIAS
+        return reads.database()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что в default
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django распознает async-режим, как у MiddlewareMixin
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _reads.set(self.reads(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _reads.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = _reads.set(self.reads(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _reads.reset(token)
+        return self.finish(request, response)
+
+    @staticmethod
+    def reads(request):
+        if (not settings.DATABASE_REPLICAS
+                or request.method not in SAFE_METHODS
+                or PIN_COOKIE in request.COOKIES):
+            return None
+        return ReplicaReads()
+
+    @staticmethod
+    def finish(request, response):
+        if (settings.DATABASE_REPLICAS
+                and request.method not in SAFE_METHODS
+                and request.method != 'OPTIONS'
+                and response.status_code < 400):
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_READ_AFTER_WRITE,
+                httponly=True, samesite='Lax')
+        return response
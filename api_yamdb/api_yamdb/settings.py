@@ -1,4 +1,5 @@
 # import sys
+import json
 import os
 # from pathlib import Path
 from datetime import timedelta
@@ -35,6 +36,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'api.instrumentation.PerformanceMiddleware',
+    'api_yamdb.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -44,6 +47,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Под ASGI - api_yamdb.urls_asgi из settings_asgi.py
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -72,9 +76,29 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', 'postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.getenv('DB_HOST', 'db'),
-        'PORT': os.getenv('DB_PORT', '5432')
+        'PORT': os.getenv('DB_PORT', '5432'),
+        # Сколько секунд поток gunicorn держит соединение; 0 - новое на
+        # каждый запрос. Под ASGI по умолчанию 0 (settings_asgi.py)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
+# Проверять постоянное соединение перед запросом (api_yamdb/db.py)
+DB_CONN_HEALTH_CHECKS = os.getenv(
+    'DB_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes')
+
+# Реплики для чтения GET и HEAD (api_yamdb/replicas.py): JSON вида
+# {"replica1": {"HOST": "db-replica", "WEIGHT": 2}}. Поля дополняют
+# настройки default, WEIGHT - доля чтений, по умолчанию 1
+DATABASE_REPLICAS = {}
+for alias, options in json.loads(os.getenv('DB_REPLICAS') or '{}').items():
+    DATABASE_REPLICAS[alias] = options.pop('WEIGHT', 1)
+    DATABASES[alias] = dict(
+        DATABASES['default'], **options, TEST={'MIRROR': 'default'})
+DATABASE_ROUTERS = ['api_yamdb.replicas.ReplicaRouter']
+# Сколько секунд после записи клиент читает из default
+REPLICA_READ_AFTER_WRITE = int(os.getenv('REPLICA_READ_AFTER_WRITE', 5))
+# На сколько секунд исключать реплику, к которой не удалось подключиться
+REPLICA_RETRY_AFTER = int(os.getenv('REPLICA_RETRY_AFTER', 30))
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -101,6 +125,71 @@ USE_L10N = True
 
 USE_TZ = True
 
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache')
+CACHES = {
+    # Версии каталога, счетчики, роли токенов, переключатели: записей
+    # немного, вытеснение не должно до них доходить
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 100000)),
+        },
+    },
+    # Данные ответов списков (api/cache.py): по записи на каждый URL,
+    # вытесняются отдельно от default
+    'responses': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'RESPONSE_CACHE_LOCATION',
+            os.path.join(BASE_DIR, 'cache', 'responses')),
+        'KEY_PREFIX': 'responses',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv(
+                'RESPONSE_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+}
+# Сколько живут закэшированные списки категорий, жанров и произведений
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))
+# Сколько объектов можно создать одним POST со списком
+BULK_CREATE_MAX_ITEMS = int(os.getenv('BULK_CREATE_MAX_ITEMS', 100))
+# Список лучших произведений: вес средней оценки каталога (сколько
+# "виртуальных" отзывов с ней добавляется каждому произведению)
+# и размер списка
+TOP_TITLES_PRIOR_VOTES = int(os.getenv('TOP_TITLES_PRIOR_VOTES', 10))
+TOP_TITLES_LIMIT = 10
+TOP_TITLES_MAX_LIMIT = 100
+# Размер пачки произведений при потоковой выгрузке
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 500))
+# Замеры запросов (api/instrumentation.py): включены ли по умолчанию,
+# как часто перечитывать флаг из кэша, с какого времени запрос медленный
+PERF_INSTRUMENTATION = os.getenv(
+    'PERF_INSTRUMENTATION', 'false').lower() in ('1', 'true', 'yes')
+PERF_SWITCH_TTL = int(os.getenv('PERF_SWITCH_TTL', 5))
+PERF_SLOW_QUERY_MS = float(os.getenv('PERF_SLOW_QUERY_MS', 100))
+# ASGI: сколько чтений api одновременно идут в БД в одном воркере
+# (api/asynchronous.py), остальные ждут в цикле событий
+ASYNC_READ_CONCURRENCY = int(os.getenv('ASYNC_READ_CONCURRENCY', 16))
+# Списки произведений, отзывов и комментариев через values() без
+# сериализаторов DRF (api/rows.py); по умолчанию выключено
+FAST_LIST_SERIALIZATION = os.getenv(
+    'FAST_LIST_SERIALIZATION', 'false').lower() in ('1', 'true', 'yes')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.performance': {'handlers': ['console'], 'level': 'INFO'},
+        'api.slow_queries': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
@@ -112,7 +201,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.RoleJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -130,8 +219,18 @@ NO_NAME = 'Пользователя с таким именем нет!'
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'webmaster@localhost'
+# Очередь писем: сколько писем за проход, сколько попыток и пауза
+# перед повтором (растет вдвое с каждой попыткой до максимума), секунды
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 100))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', 30))
+EMAIL_OUTBOX_MAX_RETRY_DELAY = int(
+    os.getenv('EMAIL_OUTBOX_MAX_RETRY_DELAY', 3600))
+# Сколько письмо остается за воркером, взявшим его в работу
+EMAIL_OUTBOX_LEASE = int(os.getenv('EMAIL_OUTBOX_LEASE', 300))
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_USER_CLASS': 'users.tokens.RoleTokenUser',
 }
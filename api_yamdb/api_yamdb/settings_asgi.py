@@ -0,0 +1,17 @@
+"""Настройки для ASGI (asgi.py, gunicorn_asgi.conf.py).
+
+Маршруты с асинхронными обертками view (api/asynchronous.py).
+Соединение с БД закрывается после каждого чтения, поэтому постоянные
+соединения по умолчанию выключены: переиспользование - у PgBouncer.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+ROOT_URLCONF = 'api_yamdb.urls_asgi'
+DATABASES = {
+    alias: dict(database,
+                CONN_MAX_AGE=int(os.getenv('DB_CONN_MAX_AGE', 0)))
+    for alias, database in DATABASES.items()
+}
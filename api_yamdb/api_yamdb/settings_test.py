@@ -0,0 +1,30 @@
+"""Настройки для pytest: база SQLite вместо контейнера с PostgreSQL."""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, os
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    },
+    # Зеркало default для tests/test_replicas.py: чтение с него включают
+    # только эти тесты
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'replica.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+DATABASE_REPLICAS = {}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+    },
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
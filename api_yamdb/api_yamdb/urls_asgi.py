@@ -0,0 +1,6 @@
+"""URLconf для ASGI: те же маршруты, представления api - корутины"""
+from api.asynchronous import asyncify_patterns
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = asyncify_patterns(sync_urlpatterns)
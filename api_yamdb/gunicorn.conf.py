@@ -1,4 +1,35 @@
-workers = 2
-threads = 4
-bind = "0.0.0.0:8000"
-module = "api_yamdb.wsgi:application"
+"""Профиль gunicorn для контейнера web.
+
+Каждый поток держит свое постоянное соединение с БД (CONN_MAX_AGE),
+поэтому контейнеру нужно workers * threads соединений PostgreSQL.
+При старте это число сверяется с DB_MAX_CONNECTIONS - долей
+max_connections сервера, отведенной этому контейнеру.
+"""
+import os
+
+bind = '0.0.0.0:8000'
+module = 'api_yamdb.wsgi:application'
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+# Перезапуск воркера закрывает и его соединения с БД
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+db_connections = workers * threads
+db_max_connections = int(os.getenv('DB_MAX_CONNECTIONS', 90))
+
+
+def on_starting(server):
+    if db_connections > db_max_connections:
+        server.log.warning(
+            'workers * threads = %d постоянных соединений с БД, '
+            'больше DB_MAX_CONNECTIONS = %d: уменьшите GUNICORN_THREADS '
+            'или DB_CONN_MAX_AGE=0',
+            db_connections, db_max_connections)
+    else:
+        server.log.info(
+            'Постоянных соединений с БД: до %d из %d',
+            db_connections, db_max_connections)
@@ -0,0 +1,39 @@
+"""Профиль gunicorn для ASGI: воркеры uvicorn.
+
+    gunicorn api_yamdb.asgi:application -c gunicorn_asgi.conf.py
+
+Чтения api идут в пуле потоков воркера (api/asynchronous.py), поэтому
+одному воркеру нужно до ASYNC_READ_CONCURRENCY соединений с БД плюс
+одно для записи. Под ASGI соединения не переживают запрос, поэтому
+api_yamdb.settings_asgi по умолчанию ставит DB_CONN_MAX_AGE=0, а
+переиспользование лучше отдать PgBouncer.
+
+Потоковая выгрузка titles/export/ под ASGI отвечает 501: Django 3.2
+не умеет отдавать потоковый ответ, не держа его целиком в памяти.
+Выгрузку обслуживает профиль WSGI (gunicorn api_yamdb.wsgi).
+"""
+import os
+
+bind = '0.0.0.0:8000'
+worker_class = 'uvicorn.workers.UvicornWorker'
+workers = int(os.getenv('GUNICORN_WORKERS', 2))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+db_connections = workers * (int(os.getenv('ASYNC_READ_CONCURRENCY', 16)) + 1)
+db_max_connections = int(os.getenv('DB_MAX_CONNECTIONS', 90))
+
+
+def on_starting(server):
+    if db_connections > db_max_connections:
+        server.log.warning(
+            'workers * (ASYNC_READ_CONCURRENCY + 1) = %d соединений с БД, '
+            'больше DB_MAX_CONNECTIONS = %d: уменьшите '
+            'ASYNC_READ_CONCURRENCY или GUNICORN_WORKERS',
+            db_connections, db_max_connections)
+    else:
+        server.log.info(
+            'Соединений с БД: до %d из %d',
+            db_connections, db_max_connections)
@@ -0,0 +1,337 @@
+import io
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+from math import gcd
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from reviews import ratings, versions
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+from .import_catalog import REBUILD_CHUNK, bulk_create_dated
+
+WORDS = (
+    'мастер', 'маргарита', 'война', 'мир', 'преступление', 'наказание',
+    'идиот', 'братья', 'отцы', 'дети', 'река', 'звезда', 'город', 'ночь',
+    'дорога', 'море', 'тень', 'сад', 'зима', 'огонь', 'песня', 'остров',
+)
+# Доля оценок 1..10: чаще ставят высокие
+SCORE_WEIGHTS = '1,1,1,2,3,5,8,10,8,5'
+# Сколько значений выбирать из распределения за один вызов
+DRAW_SIZE = 100000
+
+
+def username(pk):
+    return f'gen_user{pk}'
+
+
+def zipf(size, exponent):
+    """Накопленные веса Ципфа 1 / rank ** exponent; 0 - равномерно"""
+    return list(accumulate(1 / rank ** exponent
+                           for rank in range(1, size + 1)))
+
+
+class Permutation:
+    """Перестановка 0..size-1 без списка: ранг -> позиция.
+
+    Популярные ранги попадают на случайные id, а не на первые.
+    """
+
+    def __init__(self, rng, size):
+        self.size = size
+        self.step = rng.randrange(1, size) if size > 1 else 1
+        while gcd(self.step, size) != 1:
+            self.step += 1
+        self.shift = rng.randrange(size)
+
+    def __call__(self, rank):
+        return (rank * self.step + self.shift) % self.size
+
+
+def escape_copy(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def _value(field, obj):
+    value = getattr(obj, field.attname)
+    return field.pre_save(obj, True) if value is None else value
+
+
+class BulkWriter:
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+
+    def write(self, model, objs):
+        bulk_create_dated(model, objs, batch_size=self.batch_size)
+
+
+class CopyWriter(BulkWriter):
+    """COPY FROM STDIN в PostgreSQL, значения готовит сам Django.
+
+    Как и bulk_create, объекты без pk пишутся без колонки первичного
+    ключа: id им назначает БД. Заданные значения полей auto_now и
+    auto_now_add не перезаписываются.
+    """
+
+    def write(self, model, objs):
+        with connection.cursor() as cursor:
+            for sql, stream in self.statements(model, objs):
+                cursor.copy_expert(sql, stream)
+
+    def statements(self, model, objs):
+        """Пары (COPY ... FROM STDIN, поток строк) для объектов с pk и
+        без него"""
+        opts = model._meta
+        with_pk = [obj for obj in objs if obj.pk is not None]
+        without_pk = [obj for obj in objs if obj.pk is None]
+        for group, fields in (
+                (with_pk, opts.concrete_fields),
+                (without_pk, [field for field in opts.concrete_fields
+                              if field is not opts.pk])):
+            if group:
+                yield self.statement(opts, fields, group)
+
+    @staticmethod
+    def statement(opts, fields, objs):
+        buffer = io.StringIO()
+        for obj in objs:
+            buffer.write('\t'.join(
+                escape_copy(field.get_db_prep_save(
+                    _value(field, obj), connection))
+                for field in fields) + '\n')
+        buffer.seek(0)
+        columns = ', '.join(
+            connection.ops.quote_name(field.column) for field in fields)
+        return (f'COPY {connection.ops.quote_name(opts.db_table)} '
+                f'({columns}) FROM STDIN', buffer)
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетический каталог: пользователей, произведения с '
+        'жанрами, отзывы (не больше одного на пару произведение-автор) и '
+        'комментарии. Популярность произведений, отзывов и активность '
+        'авторов комментариев распределены по Ципфу: немного горячих '
+        'записей и длинный хвост. В PostgreSQL строки пишутся через COPY, '
+        'в остальных БД - bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (('users', 1000), ('categories', 10),
+                              ('genres', 20), ('titles', 10000),
+                              ('reviews', 100000), ('comments', 100000)):
+            parser.add_argument(f'--{name}', type=int, default=default)
+        parser.add_argument(
+            '--title-skew', type=float, default=1.1,
+            help='показатель Ципфа для отзывов по произведениям, 0 - '
+                 'равномерно')
+        parser.add_argument(
+            '--review-skew', type=float, default=1.0,
+            help='то же для комментариев по отзывам')
+        parser.add_argument(
+            '--user-skew', type=float, default=0.8,
+            help='то же для авторов комментариев')
+        parser.add_argument(
+            '--score-weights', default=SCORE_WEIGHTS,
+            help='десять весов оценок 1..10 через запятую')
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='даты отзывов и комментариев за столько последних дней')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='bulk_create и в PostgreSQL')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.verbosity = options['verbosity']
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.started = time.monotonic()
+        self.score_weights = self.parse_weights(options['score_weights'])
+        if connection.vendor == 'postgresql' and not options['no_copy']:
+            self.writer = CopyWriter(options['batch_size'])
+        else:
+            self.writer = BulkWriter(options['batch_size'])
+
+        users = self.generate_users(options['users'])
+        categories = self.generate_named(Category, options['categories'])
+        genres = self.generate_named(Genre, options['genres'])
+        titles = self.generate_titles(options['titles'], categories, genres)
+        reviews = self.generate_reviews(titles, users)
+        self.generate_comments(options['comments'], reviews, users)
+        self.finish(titles)
+
+    @staticmethod
+    def parse_weights(value):
+        try:
+            weights = [float(weight) for weight in value.split(',')]
+        except ValueError:
+            weights = []
+        if (len(weights) != len(ratings.SCORES) or not any(weights)
+                or min(weights) < 0):
+            raise CommandError(
+                '--score-weights: нужно десять неотрицательных чисел')
+        return list(accumulate(weights))
+
+    def first_id(self, model):
+        return (model.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+
+    def phrase(self, size):
+        return ' '.join(self.rng.choices(WORDS, k=size)).capitalize()
+
+    def moment(self):
+        return self.now - timedelta(
+            seconds=self.rng.random() * self.options['days'] * 86400)
+
+    def write(self, model, objs):
+        with transaction.atomic():
+            self.writer.write(model, objs)
+        if self.verbosity > 1:
+            self.report(f'{model.__name__}: +{len(objs)}')
+
+    def write_batches(self, model, objs):
+        """Пишет поток объектов пачками по batch_size"""
+        batch = []
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= self.options['batch_size']:
+                self.write(model, batch)
+                batch = []
+        if batch:
+            self.write(model, batch)
+
+    def id_range(self, model, size):
+        start = self.first_id(model)
+        return range(start, start + size)
+
+    def generate_users(self, size):
+        ids = self.id_range(User, size)
+        self.write_batches(User, (
+            User(id=pk, username=username(pk),
+                 email=f'{username(pk)}@generated.fake', date_joined=self.now)
+            for pk in ids))
+        return ids
+
+    def generate_named(self, model, size):
+        ids = self.id_range(model, size)
+        name = model._meta.model_name
+        self.write_batches(model, (
+            model(id=pk, name=f'{name.capitalize()} {pk}',
+                  slug=f'gen-{name}-{pk}')
+            for pk in ids))
+        return ids
+
+    def generate_titles(self, size, categories, genres):
+        ids = self.id_range(Title, size)
+        rng = self.rng
+        self.write_batches(Title, (
+            Title(id=pk, name=self.phrase(3), description=self.phrase(12),
+                  year=rng.randint(1900, self.now.year),
+                  category_id=rng.choice(categories) if categories else None)
+            for pk in ids))
+        if genres:
+            self.write_batches(Title.genre.through, (
+                Title.genre.through(title_id=pk, genre_id=genre)
+                for pk in ids
+                for genre in rng.sample(genres, rng.randint(
+                    1, min(3, len(genres))))))
+        return ids
+
+    def draw(self, size, count, exponent):
+        """count рангов 0..size-1 по Ципфу, порциями по DRAW_SIZE"""
+        weights = zipf(size, exponent)
+        population = range(size)
+        while count > 0:
+            yield from self.rng.choices(
+                population, cum_weights=weights, k=min(count, DRAW_SIZE))
+            count -= DRAW_SIZE
+
+    def review_counts(self, titles, users):
+        """Сколько отзывов у каждого произведения.
+
+        Отзыв один на автора, поэтому у произведения их не больше, чем
+        пользователей: излишек горячих произведений переходит к следующим
+        по популярности.
+        """
+        counts = [0] * len(titles)
+        if not titles or not users:
+            return counts
+        position = Permutation(self.rng, len(titles))
+        for rank in self.draw(len(titles), self.options['reviews'],
+                              self.options['title_skew']):
+            counts[position(rank)] += 1
+        overflow = sum(max(count - len(users), 0) for count in counts)
+        counts = [min(count, len(users)) for count in counts]
+        for rank in range(len(titles)):
+            if not overflow:
+                break
+            index = position(rank)
+            extra = min(len(users) - counts[index], overflow)
+            counts[index] += extra
+            overflow -= extra
+        return counts
+
+    def generate_reviews(self, titles, users):
+        counts = self.review_counts(titles, users)
+        ids = self.id_range(Review, sum(counts))
+        scores = ratings.SCORES
+
+        def rows():
+            pk = ids.start
+            for title_id, count in zip(titles, counts):
+                authors = self.rng.sample(users, count)
+                marks = self.rng.choices(
+                    scores, cum_weights=self.score_weights, k=count)
+                for author_id, score in zip(authors, marks):
+                    yield Review(
+                        id=pk, title_id=title_id, author_id=author_id,
+                        score=score, text=self.phrase(20),
+                        pub_date=self.moment())
+                    pk += 1
+
+        self.write_batches(Review, rows())
+        return ids
+
+    def generate_comments(self, size, reviews, users):
+        if not reviews or not users:
+            return
+        ids = self.id_range(Comment, size)
+        position = Permutation(self.rng, len(reviews))
+        authors = self.draw(len(users), size, self.options['user_skew'])
+        self.write_batches(Comment, (
+            Comment(id=pk, review_id=reviews[position(rank)],
+                    author_id=users[next(authors)], text=self.phrase(8),
+                    pub_date=self.moment())
+            for pk, rank in zip(ids, self.draw(
+                len(reviews), size, self.options['review_skew']))))
+
+    def report(self, prefix):
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(f'{prefix}, {elapsed:.1f} с')
+
+    def finish(self, titles):
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                    no_style(), [User, Category, Genre, Title, Review,
+                                 Comment]):
+                cursor.execute(sql)
+        title_ids = list(titles)
+        with transaction.atomic():
+            for start in range(0, len(title_ids), REBUILD_CHUNK):
+                ratings.rebuild(title_ids[start:start + REBUILD_CHUNK])
+        versions.bump(versions.CATEGORIES, versions.GENRES, versions.TITLES)
+        self.report(self.style.SUCCESS('Каталог создан'))
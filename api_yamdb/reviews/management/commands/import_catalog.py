@@ -0,0 +1,335 @@
+import csv
+import json
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from reviews import ratings, versions
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+MODELS = {
+    'category': Category,
+    'genre': Genre,
+    'title': Title,
+    'review': Review,
+    'comment': Comment,
+}
+# Порядок вставки: модель пишется после всех, на которые ссылается
+ORDER = ('category', 'genre', 'title', 'review', 'comment')
+FORMATS = ('json', 'ndjson', 'csv')
+READ_SIZE = 1 << 16
+# Не упираться в лимит параметров запроса SQLite
+REBUILD_CHUNK = 500
+
+
+def _skip_separators(stream, buffer, pos):
+    """Сдвигает pos к следующему значимому символу, подчитывая поток.
+
+    Пустой буфер означает конец потока.
+    """
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buffer):
+            return buffer, pos
+        buffer, pos = stream.read(READ_SIZE), 0
+        if not buffer:
+            return buffer, pos
+
+
+def iter_json_array(stream):
+    """Элементы JSON-массива по одному, без чтения файла целиком"""
+    decoder = json.JSONDecoder()
+    buffer, pos = _skip_separators(stream, '', 0)
+    if buffer[pos:pos + 1] != '[':
+        raise CommandError('Ожидается JSON-массив записей')
+    buffer, pos = _skip_separators(stream, buffer, pos + 1)
+    while buffer and buffer[pos] != ']':
+        try:
+            record, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as error:
+            chunk = stream.read(READ_SIZE)
+            if not chunk:
+                raise CommandError(f'Некорректный JSON: {error}')
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield record
+        buffer, pos = _skip_separators(stream, buffer, pos)
+    if not buffer:
+        raise CommandError('JSON-массив не закрыт')
+
+
+def iter_ndjson(stream):
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise CommandError(f'Строка {number}: {error}')
+
+
+def iter_csv(stream):
+    return csv.DictReader(stream)
+
+
+READERS = {'json': iter_json_array, 'ndjson': iter_ndjson, 'csv': iter_csv}
+
+
+def bulk_create_dated(model, objs, batch_size=None, ignore_conflicts=False):
+    """bulk_create, сохраняющий заданные даты полей auto_now_add.
+
+    При вставке auto_now_add подставляет текущее время, поэтому даты из
+    объектов возвращаются вторым запросом, bulk_update. Строки, которые
+    уже были в БД и пропущены из-за конфликта, не трогаются.
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    if not fields:
+        return model.objects.bulk_create(
+            objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts)
+    dates = {obj.pk: [getattr(obj, field.attname) for field in fields]
+             for obj in objs}
+    existing = set()
+    if ignore_conflicts:
+        existing = set(model.objects.filter(
+            pk__in=list(dates)).values_list('pk', flat=True))
+    model.objects.bulk_create(
+        objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts)
+    dated = []
+    for obj in objs:
+        values = dates[obj.pk]
+        if obj.pk in existing or all(value is None for value in values):
+            continue
+        for field, value in zip(fields, values):
+            if value is not None:
+                setattr(obj, field.attname, value)
+        dated.append(obj)
+    model.objects.bulk_update(
+        dated, [field.name for field in fields], batch_size=batch_size)
+    return objs
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоковый импорт каталога: категории, жанры, произведения, '
+        'отзывы и комментарии из JSON, NDJSON или CSV. Понимает и формат '
+        'dumpdata (infra/fixtures.json), прочие модели пропускает.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='файл или - для stdin')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='по умолчанию определяется по расширению файла')
+        parser.add_argument(
+            '--model', choices=ORDER,
+            help='модель для записей без поля model (обязательно для CSV)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='пропускать строки, нарушающие уникальность')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        self.default_model = options['model']
+        self.batch_size = options['batch_size']
+        self.ignore_conflicts = options['ignore_conflicts']
+        fmt = options['format'] or self.guess_format(options['path'])
+        if fmt == 'csv' and not self.default_model:
+            raise CommandError('Для CSV укажите --model')
+
+        self.buffers = defaultdict(list)
+        self.genre_links = []
+        self.imported = defaultdict(int)
+        self.skipped = 0
+        self.next_ids = {}
+        self.lookups = {}
+        self.touched_titles = set()
+        self.started = time.monotonic()
+
+        with self.open(options['path']) as stream:
+            for record in READERS[fmt](stream):
+                self.add(record)
+            for model in ORDER:
+                self.flush(model)
+        self.finish()
+
+    @staticmethod
+    def guess_format(path):
+        for fmt in FORMATS:
+            if path.endswith(f'.{fmt}'):
+                return fmt
+        return 'json'
+
+    @contextmanager
+    def open(self, path):
+        if path == '-':
+            yield sys.stdin
+            return
+        try:
+            stream = open(path, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(error)
+        with stream:
+            yield stream
+
+    def add(self, record):
+        if 'fields' in record:
+            # Формат dumpdata: внешние ключи заданы первичными ключами
+            app_label, _, model = record.get('model', '').partition('.')
+            if app_label != 'reviews' or model not in MODELS:
+                self.skipped += 1
+                return
+            data, by_pk = dict(record['fields'], id=record.get('pk')), True
+        else:
+            model = record.get('model') or self.default_model
+            if model not in MODELS:
+                self.skipped += 1
+                return
+            data, by_pk = record, False
+        self.buffers[model].append(
+            getattr(self, f'build_{model}')(data, by_pk))
+        if len(self.buffers[model]) >= self.batch_size:
+            self.flush(model)
+
+    def allocate_id(self, model, value):
+        """id из записи или следующий свободный"""
+        if model not in self.next_ids:
+            self.next_ids[model] = (
+                MODELS[model].objects.aggregate(Max('pk'))['pk__max'] or 0)
+        if value in (None, ''):
+            self.next_ids[model] += 1
+            return self.next_ids[model]
+        value = int(value)
+        self.next_ids[model] = max(self.next_ids[model], value)
+        return value
+
+    def lookup(self, model, field):
+        """Словарь значение поля -> id, загружается один раз"""
+        key = (model, field)
+        if key not in self.lookups:
+            self.lookups[key] = dict(
+                model.objects.values_list(field, 'pk'))
+        return self.lookups[key]
+
+    def resolve(self, model, field, value, by_pk):
+        if value in (None, ''):
+            return None
+        if by_pk:
+            return int(value)
+        try:
+            return self.lookup(model, field)[value]
+        except KeyError:
+            raise CommandError(
+                f'{model._meta.verbose_name} {field}={value!r} не найден')
+
+    def build_category(self, data, by_pk):
+        category = Category(
+            id=self.allocate_id('category', data.get('id')),
+            name=data['name'], slug=data['slug'])
+        self.lookup(Category, 'slug')[category.slug] = category.id
+        return category
+
+    def build_genre(self, data, by_pk):
+        genre = Genre(
+            id=self.allocate_id('genre', data.get('id')),
+            name=data['name'], slug=data['slug'])
+        self.lookup(Genre, 'slug')[genre.slug] = genre.id
+        return genre
+
+    def build_title(self, data, by_pk):
+        title = Title(
+            id=self.allocate_id('title', data.get('id')),
+            name=data['name'],
+            year=int(data['year']),
+            description=data.get('description') or '',
+            category_id=self.resolve(
+                Category, 'slug', data.get('category'), by_pk),
+        )
+        genres = data.get('genre') or []
+        if isinstance(genres, str):
+            genres = [slug.strip() for slug in genres.split(',')]
+        for genre in genres:
+            if genre not in (None, ''):
+                self.genre_links.append(Title.genre.through(
+                    title_id=title.id,
+                    genre_id=self.resolve(Genre, 'slug', genre, by_pk)))
+        return title
+
+    def build_review(self, data, by_pk):
+        review = Review(
+            id=self.allocate_id('review', data.get('id')),
+            title_id=int(data['title']),
+            author_id=self.resolve(User, 'username', data['author'], by_pk),
+            text=data['text'],
+            score=int(data['score']),
+            pub_date=data.get('pub_date') or None,
+        )
+        self.touched_titles.add(review.title_id)
+        return review
+
+    def build_comment(self, data, by_pk):
+        return Comment(
+            id=self.allocate_id('comment', data.get('id')),
+            review_id=int(data['review']),
+            author_id=self.resolve(User, 'username', data['author'], by_pk),
+            text=data['text'],
+            pub_date=data.get('pub_date') or None,
+        )
+
+    def flush(self, model):
+        """Пишет буфер модели, сначала сбросив буферы, на которые она
+        ссылается. Каждая пачка идет в своей транзакции."""
+        for dependency in ORDER[:ORDER.index(model)]:
+            if self.buffers[dependency]:
+                self.flush(dependency)
+        objs = self.buffers.pop(model, [])
+        if not objs:
+            return
+        with transaction.atomic():
+            bulk_create_dated(
+                MODELS[model], objs, ignore_conflicts=self.ignore_conflicts)
+            if model == 'title' and self.genre_links:
+                Title.genre.through.objects.bulk_create(
+                    self.genre_links, ignore_conflicts=self.ignore_conflicts)
+                self.genre_links = []
+            if model == 'comment':
+                self.touched_titles.update(
+                    Review.objects.filter(
+                        pk__in={comment.review_id for comment in objs}
+                    ).values_list('title_id', flat=True))
+        self.imported[model] += len(objs)
+        if self.verbosity > 1:
+            self.report(f'{model}: +{len(objs)}')
+
+    def report(self, prefix):
+        total = sum(self.imported.values())
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'{prefix}, всего {total} за {elapsed:.1f} с '
+            f'({total / elapsed if elapsed else 0:.0f} записей/с)')
+
+    def finish(self):
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                    no_style(), list(MODELS.values())):
+                cursor.execute(sql)
+        title_ids = sorted(self.touched_titles)
+        with transaction.atomic():
+            for start in range(0, len(title_ids), REBUILD_CHUNK):
+                ratings.rebuild(title_ids[start:start + REBUILD_CHUNK])
+        # bulk_create не отправляет сигналы, версии поднимаем сами
+        versions.bump(versions.CATEGORIES, versions.GENRES, versions.TITLES)
+        for model in ORDER:
+            if self.imported[model]:
+                self.stdout.write(f'{model}: {self.imported[model]}')
+        if self.skipped:
+            self.stdout.write(f'пропущено записей: {self.skipped}')
+        self.report(self.style.SUCCESS('Импорт завершен'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews import ratings
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает гистограмму оценок и рейтинг произведений '
+            'за один проход по таблице отзывов')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--title', type=int, nargs='+', dest='title_ids',
+            help='id произведений; по умолчанию пересчитываются все',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = ratings.rebuild(options['title_ids'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews import ratings
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает среднюю оценку каталога и байесовский рейтинг '
+            'произведений для /titles/top/. Запускается по расписанию.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = ratings.refresh_ranking()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено произведений: {updated}, '
+            f'средняя оценка каталога: {ratings.prior_mean():.3f}'))
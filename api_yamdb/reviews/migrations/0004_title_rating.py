@@ -0,0 +1,50 @@
+# Generated by Django 3.2 on 2026-10-18 17:57
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    alias = schema_editor.connection.alias
+    reviews = (Review.objects.using(alias).filter(title=OuterRef('pk'))
+               .order_by().values('title'))
+    Title.objects.using(alias).update(
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0),
+        rating_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            0),
+        rating=Subquery(
+            reviews.annotate(avg=Avg('score')).values('avg'),
+            output_field=models.FloatField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_auto_20230113_1432'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(editable=False, help_text='Средняя оценка, пересчитывается вместе с суммой', null=True),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Сумма оценок всех отзывов'),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2 on 2026-10-18 18:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_review_comment_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Последнее изменение произведения, его отзывов или комментариев'),
+            preserve_default=False,
+        ),
+    ]
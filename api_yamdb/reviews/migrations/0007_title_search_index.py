@@ -0,0 +1,77 @@
+# Generated by Django 3.2 on 2026-10-18 18:40
+
+from django.db import migrations
+
+# DDL на момент миграции; reviews/search.py может меняться дальше
+POSTGRESQL_SETUP = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    "ALTER TABLE reviews_title ADD COLUMN IF NOT EXISTS search_vector "
+    "tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+    ") STORED",
+    'CREATE INDEX IF NOT EXISTS reviews_title_search_idx '
+    'ON reviews_title USING gin (search_vector)',
+    'CREATE INDEX IF NOT EXISTS reviews_title_name_trgm_idx '
+    'ON reviews_title USING gin (name gin_trgm_ops)',
+)
+POSTGRESQL_TEARDOWN = (
+    'DROP INDEX IF EXISTS reviews_title_name_trgm_idx',
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+)
+
+SQLITE_SETUP = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5("
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_ai '
+    'AFTER INSERT ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_ad '
+    'AFTER DELETE ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    'END',
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_au '
+    'AFTER UPDATE OF name, description ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+)
+SQLITE_TEARDOWN = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ai',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ad',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_au',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+SETUP = {'postgresql': POSTGRESQL_SETUP, 'sqlite': SQLITE_SETUP}
+TEARDOWN = {'postgresql': POSTGRESQL_TEARDOWN, 'sqlite': SQLITE_TEARDOWN}
+
+
+def _execute(schema_editor, statements):
+    vendor = schema_editor.connection.vendor
+    for statement in statements.get(vendor, ()):
+        schema_editor.execute(statement, params=None)
+
+
+def install(apps, schema_editor):
+    _execute(schema_editor, SETUP)
+
+
+def uninstall(apps, schema_editor):
+    _execute(schema_editor, TEARDOWN)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2 on 2026-10-18 18:18
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_histogram(apps, schema_editor):
+    """Гистограмма одним INSERT ... SELECT ... GROUP BY"""
+    Review = apps.get_model('reviews', 'Review')
+    TitleScore = apps.get_model('reviews', 'TitleScore')
+    connection = schema_editor.connection
+    reviews = Review.objects.using(connection.alias).order_by()
+    sql, params = reviews.values('title_id', 'score').annotate(
+        total=Count('pk')).query.sql_with_params()
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(column)
+                        for column in ('title_id', 'score', 'count'))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(TitleScore._meta.db_table)} ({columns}) '
+            f'{sql}', params)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='reviews.title')),
+            ],
+            options={
+                'verbose_name': 'Оценки произведения',
+                'verbose_name_plural': 'Оценки произведений',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlescore',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='unique_title_score'),
+        ),
+        migrations.RunPython(fill_histogram, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2 on 2026-10-18 18:19
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField, Sum
+from django.db.models.functions import Cast
+
+# C для пустого каталога: середина шкалы
+DEFAULT_PRIOR = 5.5
+
+
+def fill_weighted_rating(apps, schema_editor):
+    """(sum + m * C) / (count + m), C - средняя оценка каталога"""
+    Title = apps.get_model('reviews', 'Title')
+    titles = Title.objects.using(schema_editor.connection.alias)
+    totals = titles.aggregate(
+        total=Sum('rating_sum'), count=Sum('rating_count'))
+    prior = (totals['total'] / totals['count'] if totals['count']
+             else DEFAULT_PRIOR)
+    votes = getattr(settings, 'TOP_TITLES_PRIOR_VOTES', 10)
+    titles.update(weighted_rating=ExpressionWrapper(
+        (Cast(F('rating_sum'), FloatField()) + votes * prior)
+        / (F('rating_count') + votes),
+        output_field=FloatField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(editable=False, help_text='Байесовский рейтинг для списка лучших произведений', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-weighted_rating', 'id'], name='title_weighted_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-weighted_rating', 'id'], name='title_category_weighted_idx'),
+        ),
+        migrations.RunPython(
+            fill_weighted_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_weighted_rating'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+        ),
+        # У автоматической таблицы M2M нет Meta.indexes: уникальный индекс
+        # (title_id, genre_id) ведет от произведения к жанрам, этот -
+        # от жанра к произведениям для фильтров genre и genre_all
+        migrations.RunSQL(
+            'CREATE INDEX reviews_title_genre_genre_title_idx '
+            'ON reviews_title_genre (genre_id, title_id)',
+            'DROP INDEX reviews_title_genre_genre_title_idx',
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+# ORDER BY rating DESC NULLS LAST, id DESC: обратный проход по
+# title_rating_idx дал бы NULL первыми. SQLite читает title_rating_idx
+# и так, а NULLS LAST в индексе не поддерживает
+CREATE_RATING_DESC = (
+    'CREATE INDEX IF NOT EXISTS title_rating_desc_idx '
+    'ON reviews_title (rating DESC NULLS LAST, id DESC)'
+)
+DROP_RATING_DESC = 'DROP INDEX IF EXISTS title_rating_desc_idx'
+
+
+def create_rating_desc(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_RATING_DESC)
+
+
+def drop_rating_desc(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_RATING_DESC)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='title',
+            options={'ordering': ('pk',), 'verbose_name': 'Произведение', 'verbose_name_plural': 'Произведения'},
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'id'], name='title_name_idx'),
+        ),
+        migrations.RunPython(create_rating_desc, drop_rating_desc),
+    ]
@@ -45,10 +45,57 @@ class Title(models.Model):
     year = models.IntegerField(
         validators=(true_years_validator,),
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Сумма оценок всех отзывов',
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Количество отзывов',
+    )
+    rating = models.FloatField(
+        null=True,
+        editable=False,
+        help_text='Средняя оценка, пересчитывается вместе с суммой',
+    )
+    weighted_rating = models.FloatField(
+        null=True,
+        editable=False,
+        help_text='Байесовский рейтинг для списка лучших произведений',
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        help_text='Последнее изменение произведения, его отзывов '
+                  'или комментариев',
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Стабильные страницы при пагинации по смещению
+        ordering = ('pk',)
+        indexes = (
+            models.Index(
+                fields=('-weighted_rating', 'id'),
+                name='title_weighted_rating_idx'
+            ),
+            models.Index(
+                fields=('category', '-weighted_rating', 'id'),
+                name='title_category_weighted_idx'
+            ),
+            # Диапазоны года и рейтинга в фильтрах списка
+            models.Index(
+                fields=('category', 'year'),
+                name='title_category_year_idx'
+            ),
+            models.Index(fields=('year', 'id'), name='title_year_idx'),
+            models.Index(fields=('rating', 'id'), name='title_rating_idx'),
+            # Сортировка ?ordering=name; rating и year идут по индексам
+            # выше, для -rating в PostgreSQL есть отдельный (миграция 0011)
+            models.Index(fields=('name', 'id'), name='title_name_idx'),
+        )
 
     def __str__(self):
         return self.name
@@ -89,11 +136,42 @@ class Review(models.Model):
                 name='unique_review'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
 
 
+class TitleScore(models.Model):
+    """Сколько отзывов с данной оценкой у произведения.
+
+    Гистограмма оценок без GROUP BY по отзывам: строки сдвигаются
+    вместе с рейтингом при каждой записи отзыва.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='scores',
+    )
+    score = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'score'),
+                name='unique_title_score'
+            ),
+        )
+        verbose_name = 'Оценки произведения'
+        verbose_name_plural = 'Оценки произведений'
+
+
 class Comment(models.Model):
     review = models.ForeignKey(
         Review,
@@ -117,6 +195,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ("-pub_date", "-pk")
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
@@ -0,0 +1,205 @@
+"""Денормализованный рейтинг произведений.
+
+Сумма и количество оценок хранятся в самом произведении и сдвигаются
+одним UPDATE с F-выражениями, поэтому параллельные записи отзывов
+не теряют изменения друг друга. Так же сдвигается гистограмма оценок
+в TitleScore.
+
+Для списка лучших произведений хранится байесовский рейтинг
+(sum + m * C) / (count + m): m - вес априорной оценки
+(TOP_TITLES_PRIOR_VOTES), C - средняя оценка по всему каталогу. C лежит
+в кэше и обновляется командой refresh_top_titles, между запусками
+рейтинг сдвигается вместе с суммой и количеством оценок.
+"""
+from collections import Counter
+from statistics import median
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import (Count, ExpressionWrapper, F, FloatField,
+                              OuterRef, Subquery, Sum)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from . import versions
+from .models import Review, Title, TitleScore
+
+SCORES = range(1, 11)
+PRIOR_KEY = 'ratings:prior_mean'
+# C для пустого каталога: середина шкалы
+DEFAULT_PRIOR = 5.5
+
+
+def compute_prior():
+    """Средняя оценка по всем отзывам каталога"""
+    totals = Title.objects.aggregate(
+        total=Sum('rating_sum'), count=Sum('rating_count'))
+    if not totals['count']:
+        return DEFAULT_PRIOR
+    return totals['total'] / totals['count']
+
+
+def prior_mean():
+    prior = cache.get(PRIOR_KEY)
+    if prior is None:
+        prior = compute_prior()
+        cache.set(PRIOR_KEY, prior, timeout=None)
+    return prior
+
+
+def weighted_rating(delta_sum=0, delta_count=0, prior=None):
+    """Выражение байесовского рейтинга после сдвига суммы и количества"""
+    votes = settings.TOP_TITLES_PRIOR_VOTES
+    prior = prior_mean() if prior is None else prior
+    return ExpressionWrapper(
+        (Cast(F('rating_sum') + delta_sum, FloatField()) + votes * prior)
+        / (F('rating_count') + delta_count + votes),
+        output_field=FloatField(),
+    )
+
+
+def _shift(title_id, delta_sum, delta_count):
+    """Сдвигает сумму и количество оценок и пересчитывает среднее"""
+    versions.bump(versions.TITLES)
+    return Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + delta_sum,
+        rating_count=F('rating_count') + delta_count,
+        rating=ExpressionWrapper(
+            Cast(F('rating_sum') + delta_sum, FloatField())
+            / NullIf(F('rating_count') + delta_count, 0),
+            output_field=FloatField(),
+        ),
+        weighted_rating=weighted_rating(delta_sum, delta_count),
+        modified=timezone.now(),
+    )
+
+
+def _count(title_id, changes):
+    """Сдвигает счетчики гистограммы: changes - {оценка: приращение}"""
+    changes = {score: delta for score, delta in changes.items() if delta}
+    TitleScore.objects.bulk_create(
+        [TitleScore(title_id=title_id, score=score)
+         for score, delta in changes.items() if delta > 0],
+        ignore_conflicts=True)
+    for score, delta in changes.items():
+        TitleScore.objects.filter(title_id=title_id, score=score).update(
+            count=F('count') + delta)
+
+
+def add_score(title_id, score):
+    """Новый отзыв"""
+    _count(title_id, {score: 1})
+    return _shift(title_id, score, 1)
+
+
+def add_scores(title_id, scores):
+    """Несколько новых отзывов сразу"""
+    _count(title_id, Counter(scores))
+    return _shift(title_id, sum(scores), len(scores))
+
+
+def change_score(title_id, old_score, new_score):
+    """Изменен существующий отзыв"""
+    if old_score == new_score:
+        return versions.touch_title(title_id)
+    _count(title_id, {old_score: -1, new_score: 1})
+    return _shift(title_id, new_score - old_score, 0)
+
+
+def remove_score(title_id, score):
+    """Отзыв удален"""
+    _count(title_id, {score: -1})
+    return _shift(title_id, -score, -1)
+
+
+def rebuild_histogram(title_ids=None):
+    """Гистограмма заново одним INSERT ... SELECT ... GROUP BY,
+    то есть за один проход по таблице отзывов."""
+    if title_ids is not None and not title_ids:
+        return
+    reviews = Review.objects.order_by()
+    scores = TitleScore.objects.all()
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+        scores = scores.filter(title_id__in=title_ids)
+    scores.delete()
+    sql, params = reviews.values('title_id', 'score').annotate(
+        total=Count('pk')).query.sql_with_params()
+    connection = connections[scores.db]
+    table, columns = (
+        connection.ops.quote_name(TitleScore._meta.db_table),
+        ', '.join(connection.ops.quote_name(column)
+                  for column in ('title_id', 'score', 'count')))
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {table} ({columns}) {sql}', params)
+
+
+def rebuild(title_ids=None):
+    """Пересчитывает гистограмму и рейтинг с нуля по таблице отзывов.
+
+    Отзывы читаются один раз, рейтинг считается уже по гистограмме.
+    Без title_ids пересчитываются все произведения.
+    """
+    if title_ids is not None and not title_ids:
+        return 0
+    rebuild_histogram(title_ids)
+    histogram = (TitleScore.objects.filter(title=OuterRef('pk'))
+                 .order_by().values('title'))
+    total = Sum(F('score') * F('count'))
+    count = Sum('count')
+    versions.bump(versions.TITLES)
+    titles = Title.objects.all()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    updated = titles.update(
+        rating_sum=Coalesce(
+            Subquery(histogram.annotate(total=total).values('total')), 0),
+        rating_count=Coalesce(
+            Subquery(histogram.annotate(total=count).values('total')), 0),
+        rating=Subquery(
+            histogram.annotate(avg=ExpressionWrapper(
+                Cast(total, FloatField()) / NullIf(count, 0),
+                output_field=FloatField(),
+            )).values('avg'),
+            output_field=FloatField()),
+        modified=timezone.now(),
+    )
+    titles.update(weighted_rating=weighted_rating())
+    return updated
+
+
+def refresh_ranking():
+    """Пересчитывает C и байесовский рейтинг всех произведений"""
+    prior = compute_prior()
+    cache.set(PRIOR_KEY, prior, timeout=None)
+    versions.bump(versions.TITLES)
+    return Title.objects.update(weighted_rating=weighted_rating(prior=prior))
+
+
+def stats(title_id):
+    """Гистограмма, среднее, медиана и число оценок произведения"""
+    counts = dict(TitleScore.objects.filter(
+        title_id=title_id, count__gt=0).values_list('score', 'count'))
+    histogram = {score: counts.get(score, 0) for score in SCORES}
+    count = sum(histogram.values())
+    if not count:
+        return {'count': 0, 'mean': None, 'median': None,
+                'histogram': histogram}
+    return {
+        'count': count,
+        'mean': sum(score * n for score, n in histogram.items()) / count,
+        'median': _median(histogram, count),
+        'histogram': histogram,
+    }
+
+
+def _median(histogram, count):
+    """Медиана по гистограмме, без развертывания в список оценок"""
+    middle = {(count - 1) // 2, count // 2}
+    values, seen = [], 0
+    for score, n in histogram.items():
+        values.extend(score for position in middle
+                      if seen <= position < seen + n)
+        seen += n
+    return median(values)
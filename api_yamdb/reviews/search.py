@@ -0,0 +1,141 @@
+"""Полнотекстовый поиск произведений по названию и описанию.
+
+PostgreSQL: генерируемая колонка search_vector (tsvector) с GIN-индексом
+и триграммный GIN-индекс по названию для запросов с опечатками.
+SQLite: внешняя FTS5-таблица reviews_title_fts, которую поддерживают
+триггеры на reviews_title.
+
+Индексы обновляет сама БД при каждом сохранении произведения, в том
+числе при bulk_create и UPDATE через QuerySet.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+WORD = re.compile(r'\w+')
+
+POSTGRESQL_SETUP = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    "ALTER TABLE reviews_title ADD COLUMN IF NOT EXISTS search_vector "
+    "tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+    ") STORED",
+    'CREATE INDEX IF NOT EXISTS reviews_title_search_idx '
+    'ON reviews_title USING gin (search_vector)',
+    'CREATE INDEX IF NOT EXISTS reviews_title_name_trgm_idx '
+    'ON reviews_title USING gin (name gin_trgm_ops)',
+)
+POSTGRESQL_TEARDOWN = (
+    'DROP INDEX IF EXISTS reviews_title_name_trgm_idx',
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+)
+
+SQLITE_SETUP = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5("
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_ai '
+    'AFTER INSERT ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_ad '
+    'AFTER DELETE ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    'END',
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_au '
+    'AFTER UPDATE OF name, description ON reviews_title BEGIN '
+    'INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name, '
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+)
+SQLITE_TEARDOWN = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ai',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ad',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_au',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+SETUP = {'postgresql': POSTGRESQL_SETUP, 'sqlite': SQLITE_SETUP}
+TEARDOWN = {'postgresql': POSTGRESQL_TEARDOWN, 'sqlite': SQLITE_TEARDOWN}
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install(connection):
+    _execute(connection, SETUP.get(connection.vendor, ()))
+
+
+def uninstall(connection):
+    _execute(connection, TEARDOWN.get(connection.vendor, ()))
+
+
+def reinstall_sqlite_triggers(using, **kwargs):
+    """post_migrate: SQLite теряет триггеры, когда миграция пересоздает
+    таблицу reviews_title, поэтому восстанавливаем их и индекс."""
+    connection = connections[using]
+    if (connection.vendor == 'sqlite'
+            and 'reviews_title_fts' in connection.introspection.table_names()):
+        install(connection)
+
+
+def search_titles(queryset, query):
+    """Произведения по запросу, от самых релевантных.
+
+    Каждое слово запроса ищется как префикс, все слова обязательны.
+    """
+    words = WORD.findall(query.lower())
+    if not words:
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return _search_postgresql(queryset, words, query)
+    if vendor == 'sqlite':
+        return _search_sqlite(queryset, words)
+    return queryset.filter(name__icontains=query)
+
+
+def _search_postgresql(queryset, words, query):
+    tsquery = ' & '.join(f'{word}:*' for word in words)
+    # name %% query: триграммная похожесть выше pg_trgm.similarity_threshold
+    matches = (
+        "reviews_title.search_vector @@ to_tsquery('simple', %s) "
+        'OR reviews_title.name %% %s'
+    )
+    rank = (
+        "CASE WHEN reviews_title.search_vector @@ to_tsquery('simple', %s) "
+        "THEN 1 + ts_rank(reviews_title.search_vector, "
+        "to_tsquery('simple', %s)) "
+        'ELSE similarity(reviews_title.name, %s) END'
+    )
+    return queryset.alias(
+        search_match=RawSQL(
+            matches, (tsquery, query), output_field=BooleanField()),
+    ).filter(search_match=True).annotate(
+        search_rank=RawSQL(
+            rank, (tsquery, tsquery, query), output_field=FloatField()),
+    ).order_by('-search_rank', 'pk')
+
+
+def _search_sqlite(queryset, words):
+    match = ' '.join(f'"{word}"*' for word in words)
+    rank = (
+        'SELECT -bm25(reviews_title_fts, 2.0, 1.0) FROM reviews_title_fts '
+        'WHERE reviews_title_fts MATCH %s '
+        'AND reviews_title_fts.rowid = reviews_title.id'
+    )
+    return queryset.filter(pk__in=RawSQL(
+        'SELECT rowid FROM reviews_title_fts '
+        'WHERE reviews_title_fts MATCH %s', (match,),
+    )).annotate(
+        search_rank=RawSQL(rank, (match,), output_field=FloatField()),
+    ).order_by('-search_rank', 'pk')
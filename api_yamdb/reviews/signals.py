@@ -0,0 +1,46 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from users.models import User
+from . import versions
+from .models import Category, Genre, Title
+
+
+@receiver((post_save, post_delete), sender=Category)
+def category_changed(**kwargs):
+    versions.bump(versions.CATEGORIES)
+
+
+@receiver((post_save, post_delete), sender=Genre)
+def genre_changed(**kwargs):
+    versions.bump(versions.GENRES)
+
+
+@receiver((post_save, post_delete), sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_changed(**kwargs):
+    versions.bump(versions.TITLES)
+
+
+@receiver(pre_save, sender=User)
+def username_changing(instance, update_fields=None, **kwargs):
+    """Имя автора выводится в отзывах и комментариях"""
+    if instance.pk is None or (
+            update_fields is not None and 'username' not in update_fields):
+        return
+    old = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True).first()
+    instance._username_changed = old is not None and old != instance.username
+
+
+@receiver(post_save, sender=User)
+def username_changed(instance, **kwargs):
+    if instance.__dict__.pop('_username_changed', False):
+        versions.touch_author_titles(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def author_deleted(instance, **kwargs):
+    """До каскада: после него отзывов и комментариев автора уже нет"""
+    versions.touch_author_titles(instance.pk)
@@ -0,0 +1,68 @@
+"""Версии данных каталога.
+
+Каждая запись в категории, жанры или произведения (включая изменение
+рейтинга) увеличивает версию соответствующего раздела. Версии входят в
+ключи кэша, поэтому старые записи кэша просто перестают читаться.
+
+Для отдельного произведения версией служит Title.modified: его
+сдвигает любая запись в отзывы и комментарии этого произведения, а
+также смена имени или удаление их автора.
+"""
+import time
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Title
+
+CATEGORIES = 'categories'
+GENRES = 'genres'
+TITLES = 'titles'
+
+KEY = 'catalog:version:{}'
+
+
+def _initial():
+    # После вытеснения ключа версия не должна повториться
+    return int(time.time() * 1000)
+
+
+def get_versions(*names):
+    """Текущие версии разделов одним обращением к кэшу"""
+    keys = [KEY.format(name) for name in names]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, _initial(), timeout=None)
+        found.update(cache.get_many(missing))
+    return tuple(found[key] for key in keys)
+
+
+def bump(*names):
+    """Увеличивает версии после фиксации текущей транзакции"""
+    transaction.on_commit(partial(_bump, names))
+
+
+def _bump(names):
+    for name in names:
+        key = KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial(), timeout=None)
+
+
+def touch_title(title_id):
+    return Title.objects.filter(pk=title_id).update(modified=timezone.now())
+
+
+def touch_author_titles(user_id):
+    """Произведения, в отзывах и комментариях которых пишет автор"""
+    return Title.objects.filter(
+        Q(reviews__author_id=user_id)
+        | Q(reviews__comments__author_id=user_id)
+    ).update(modified=timezone.now())
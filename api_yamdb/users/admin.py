@@ -1,7 +1,15 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 admin.site.register(User, UserAdmin)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'created',
+                    'sent')
+    list_filter = ('status',)
+    search_fields = ('recipient',)
@@ -0,0 +1,26 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import ROLE_CLAIM, RoleTokenUser, is_stale
+
+
+class RoleJWTAuthentication(JWTAuthentication):
+    """Аутентификация по claims токена, без запроса пользователя из БД.
+
+    Токены, выпущенные до появления роли в claims, проверяются по БД,
+    как в обычной JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Токен не содержит id пользователя')
+        if ROLE_CLAIM in validated_token:
+            if is_stale(user_id, validated_token[ROLE_CLAIM]):
+                raise AuthenticationFailed(
+                    'Токен отозван, получите новый', code='token_revoked')
+            return RoleTokenUser(validated_token)
+        return RoleTokenUser.from_user(super().get_user(validated_token))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users import outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutgoingEmail'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='не завершаться, а ждать новых писем')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='пауза между проверками очереди в режиме --watch, секунды')
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            count = outbox.send_batch(options['batch_size'])
+            processed += count
+            if count:
+                continue
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано писем: {processed}'))
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, UserManager
+from django.utils import timezone
 from api_yamdb.settings import (NOT_MI_NAME,
                                 RESERVED_NAME)
 
@@ -37,6 +38,7 @@ class User(AbstractUser):
     bio = models.TextField(blank=True)
     role = models.CharField(max_length=200, choices=ROLES, default=USER)
     username = models.CharField(max_length=150, unique=True, db_index=True)
+    email = models.EmailField(max_length=254, unique=True)
     objects = MyUserManager()
 
     REQUIRED_FIELDS = ('email', 'password')
@@ -57,3 +59,38 @@ class User(AbstractUser):
     @property
     def is_user(self):
         return self.role == self.USER
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (outbox)"""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, PENDING),
+        (SENT, SENT),
+        (FAILED, FAILED)
+    ]
+    recipient = models.EmailField(max_length=254)
+    from_email = models.CharField(max_length=254)
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    sent = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ('next_attempt', 'id')
+        indexes = [
+            models.Index(fields=('status', 'next_attempt'),
+                         name='outgoing_email_due_idx'),
+        ]
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient}'
@@ -0,0 +1,155 @@
+"""Очередь исходящих писем.
+
+Запрос только пишет строку OutgoingEmail, отправляет письма команда
+send_emails: пачками через одно SMTP-соединение, с повтором неудачных
+отправок по нарастающей паузе.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+COUNTER_KEY = 'outbox:{}'
+SENT = 'sent'
+RETRIED = 'retried'
+FAILED = 'failed'
+LATENCY = 'latency_ms'
+
+
+def enqueue(recipient, subject, body, from_email=None):
+    return OutgoingEmail.objects.create(
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def _pending():
+    return OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING)
+
+
+def _claim(batch_size, now):
+    """Берет в работу пачку писем, срок которых подошел.
+
+    Письма уходят в аренду на EMAIL_OUTBOX_LEASE: параллельный воркер
+    их пропустит, а если этот воркер упадет, письма вернутся в очередь.
+    """
+    with transaction.atomic():
+        batch = list(
+            _pending().filter(next_attempt__lte=now)
+            .select_for_update(skip_locked=True)[:batch_size])
+        if batch:
+            OutgoingEmail.objects.filter(
+                pk__in=[email.pk for email in batch]
+            ).update(next_attempt=now + timedelta(
+                seconds=settings.EMAIL_OUTBOX_LEASE))
+    return batch
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_RETRY_DELAY))
+
+
+def _fail(email, error, now):
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.next_attempt = now + _retry_delay(email.attempts)
+    email.save(update_fields=(
+        'attempts', 'last_error', 'status', 'next_attempt'))
+    return FAILED if email.status == OutgoingEmail.FAILED else RETRIED
+
+
+def _record(name, value):
+    key = COUNTER_KEY.format(name)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, value)
+    except ValueError:
+        cache.set(key, value, timeout=None)
+
+
+def _deliver(batch, now, counts):
+    """Отправляет пачку через одно соединение, возвращает отправленные"""
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        logger.warning('Почтовый сервер недоступен: %r', error)
+        for email in batch:
+            counts[_fail(email, error, now)] += 1
+        return []
+    sent = []
+    with connection:
+        for email in batch:
+            try:
+                EmailMessage(
+                    email.subject, email.body, email.from_email,
+                    [email.recipient], connection=connection,
+                ).send()
+            except Exception as error:
+                counts[_fail(email, error, now)] += 1
+            else:
+                sent.append(email)
+    return sent
+
+
+def send_batch(batch_size=None, now=None):
+    """Отправляет одну пачку писем, возвращает число обработанных"""
+    now = now or timezone.now()
+    batch = _claim(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE, now)
+    if not batch:
+        return 0
+    counts = {SENT: 0, RETRIED: 0, FAILED: 0}
+    sent = _deliver(batch, now, counts)
+    if sent:
+        sent_at = timezone.now()
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in sent]
+        ).update(status=OutgoingEmail.SENT, sent=sent_at)
+        counts[SENT] = len(sent)
+        _record(LATENCY, sum(
+            int((sent_at - email.created).total_seconds() * 1000)
+            for email in sent))
+    for name, value in counts.items():
+        if value:
+            _record(name, value)
+    logger.info(
+        'Письма: отправлено %d, отложено %d, не доставлено %d, '
+        'в очереди %d',
+        counts[SENT], counts[RETRIED], counts[FAILED], _pending().count())
+    return len(batch)
+
+
+def stats():
+    """Глубина очереди, возраст старейшего письма и счетчики отправки"""
+    counters = cache.get_many(
+        [COUNTER_KEY.format(name) for name in (SENT, RETRIED, FAILED,
+                                               LATENCY)])
+    result = {
+        name: counters.get(COUNTER_KEY.format(name), 0)
+        for name in (SENT, RETRIED, FAILED)
+    }
+    latency = counters.get(COUNTER_KEY.format(LATENCY), 0)
+    result['avg_latency_seconds'] = (
+        latency / result[SENT] / 1000 if result[SENT] else None)
+    pending = _pending()
+    result['depth'] = pending.count()
+    oldest = pending.order_by('created').values_list(
+        'created', flat=True).first()
+    result['oldest_pending_seconds'] = (
+        (timezone.now() - oldest).total_seconds() if oldest else None)
+    return result
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import tokens
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def user_saved(instance, **kwargs):
+    """Любое сохранение, в том числе из админки и shell"""
+    tokens.publish_role(instance.pk, instance.role)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(instance, **kwargs):
+    tokens.publish_role(instance.pk, None)
@@ -0,0 +1,100 @@
+"""JWT с ролью пользователя.
+
+В токен доступа кроме id кладутся username и role, и аутентификация
+строит пользователя прямо из токена, без запроса к БД. Токен
+принимается, пока его роль совпадает с текущей ролью пользователя. Та
+лежит в кэше: ее пишут сигналы User (users/signals.py) после каждого
+сохранения и удаления, а если ключ вытеснен, роль один раз читается из
+БД. Изменения через QuerySet.update() сигналов не отправляют: после них
+нужен publish_role().
+"""
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import User
+
+USERNAME_CLAIM = 'username'
+ROLE_CLAIM = 'role'
+ROLE_KEY = 'auth:role:{}'
+# Роль удаленного пользователя: не совпадет ни с одним токеном
+DELETED = ''
+
+
+class RoleAccessToken(AccessToken):
+    """Токен доступа с username и ролью"""
+
+    @classmethod
+    def for_user(cls, user):
+        cache.add(ROLE_KEY.format(user.pk), user.role, timeout=_timeout())
+        token = super().for_user(user)
+        token[USERNAME_CLAIM] = user.username
+        token[ROLE_CLAIM] = user.role
+        return token
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь из claims токена, нужен правам доступа и views"""
+
+    @cached_property
+    def role(self):
+        return self.token.get(ROLE_CLAIM, User.USER)
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    @property
+    def is_user(self):
+        return self.role == User.USER
+
+    @classmethod
+    def from_user(cls, user):
+        return cls({
+            api_settings.USER_ID_CLAIM: getattr(
+                user, api_settings.USER_ID_FIELD),
+            USERNAME_CLAIM: user.username,
+            ROLE_CLAIM: user.role,
+        })
+
+    def as_model(self):
+        """Экземпляр User без запроса к БД, для внешних ключей"""
+        return User(pk=self.id, username=self.username, role=self.role)
+
+
+def _timeout():
+    return int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+
+def publish_role(user_id, role):
+    """Токены с ролью, отличной от role, перестают приниматься после
+    фиксации транзакции. role=None отзывает все токены пользователя."""
+    transaction.on_commit(partial(
+        cache.set, ROLE_KEY.format(user_id), role or DELETED,
+        timeout=_timeout()))
+
+
+def current_role(user_id):
+    """Роль из кэша, при промахе - из БД"""
+    key = ROLE_KEY.format(user_id)
+    role = cache.get(key)
+    if role is None:
+        role = User.objects.filter(pk=user_id).values_list(
+            'role', flat=True).first() or DELETED
+        # add, а не set: не затереть роль, которую опубликовали после
+        # чтения из БД
+        cache.add(key, role, timeout=_timeout())
+    return role
+
+
+def is_stale(user_id, role):
+    return current_role(user_id) != role
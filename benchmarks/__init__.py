@@ -0,0 +1,7 @@
+"""Замеры производительности API.
+
+Запускаются из корня репозитория как модули:
+
+    python -m benchmarks.run --scale small --output before.json
+    python -m benchmarks.connections
+"""
@@ -0,0 +1,186 @@
+"""WSGI (gunicorn gthread) против ASGI (gunicorn + uvicorn) на чтении.
+
+Оба сервера поднимаются со своими профилями из api_yamdb/ на одной
+синтетической базе. Затем одинаковая нагрузка: --concurrency
+одновременных клиентов, каждый по кругу читает списки и объекты
+каталога. Для каждого уровня параллелизма выводятся перцентили
+задержки, пропускная способность и число ошибок в JSON.
+
+    python -m benchmarks.asgi --concurrency 8 32 128 --db-delay 20
+
+--db-delay добавляет каждому SQL-запросу задержку в мс: на локальном
+SQLite без нее нет ожидания БД, которое и занимает потоки WSGI.
+Нужны gunicorn и uvicorn из requirements.txt.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from .common import ROOT, setup
+from .run import percentile, git_commit
+
+PROFILES = {
+    'wsgi': ('api_yamdb.wsgi:application', 'gunicorn.conf.py',
+             'benchmarks.server_settings'),
+    'asgi': ('api_yamdb.asgi:application', 'gunicorn_asgi.conf.py',
+             'benchmarks.server_settings_asgi'),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--settings', default='api_yamdb.settings_test')
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[8, 32, 128])
+    parser.add_argument('--requests', type=int, default=1000,
+                        help='запросов на каждый уровень параллелизма')
+    parser.add_argument('--db-delay', type=float, default=20)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--titles', type=int, default=200)
+    parser.add_argument('--output', help='файл для JSON, иначе stdout')
+    return parser.parse_args()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def server(profile, args):
+    application, config, settings_module = PROFILES[profile]
+    from django.conf import settings
+    database = settings.DATABASES['default']
+    port = free_port()
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join((ROOT, os.path.join(ROOT, 'api_yamdb'))),
+        DJANGO_SETTINGS_MODULE=settings_module,
+        BENCH_DB_ENGINE=database['ENGINE'],
+        BENCH_DB_NAME=database['NAME'],
+        BENCH_DB_DELAY_MS=str(args.db_delay),
+        GUNICORN_WORKERS=str(args.workers),
+    )
+    process = subprocess.Popen(
+        ['gunicorn', application, '-c', config,
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+        cwd=os.path.join(ROOT, 'api_yamdb'), env=env)
+    try:
+        wait_for(port)
+        yield port
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), 1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Сервер на порту {port} не поднялся')
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'
+            'Connection: close\r\n\r\n'.encode())
+        await writer.drain()
+        status = (await reader.readline()).split()[1]
+        await reader.read()
+        return int(status)
+    finally:
+        writer.close()
+
+
+async def load(port, paths, concurrency, total):
+    timings, errors = [], 0
+    queue = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        for number in queue:
+            started = time.perf_counter()
+            try:
+                status = await fetch(port, paths[number % len(paths)])
+            except (OSError, IndexError, ValueError):
+                status = 0
+            timings.append((time.perf_counter() - started) * 1000)
+            errors += status != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'max_ms': round(timings[-1], 2),
+        'requests_per_second': round(total / elapsed, 1),
+        'errors': errors,
+    }
+
+
+def read_paths():
+    from reviews.models import Review
+    review = Review.objects.order_by('pk').first()
+    return (
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        '/api/v1/titles/',
+        f'/api/v1/titles/{review.title_id}/',
+        f'/api/v1/titles/{review.title_id}/reviews/',
+        f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/',
+        f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/',
+    )
+
+
+def main():
+    args = parse_args()
+    setup(args.settings)
+    from . import dataset
+
+    sizes = dict(dataset.SCALES['small'], titles=args.titles)
+    dataset.generate(**sizes)
+    paths = read_paths()
+    results = {}
+    for profile in PROFILES:
+        with server(profile, args) as port:
+            asyncio.run(load(port, paths, 4, 50))
+            results[profile] = {}
+            for concurrency in args.concurrency:
+                result = asyncio.run(
+                    load(port, paths, concurrency, args.requests))
+                results[profile][concurrency] = result
+                print(f'{profile} x{concurrency:<4} '
+                      f'p50 {result["p50_ms"]:8.1f} '
+                      f'p99 {result["p99_ms"]:8.1f} мс '
+                      f'{result["requests_per_second"]:8.1f} rps',
+                      file=sys.stderr)
+    output = json.dumps({
+        'meta': {'commit': git_commit(), 'db_delay_ms': args.db_delay,
+                 'workers': args.workers, 'requests': args.requests},
+        'results': results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            stream.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
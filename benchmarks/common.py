@@ -0,0 +1,28 @@
+"""Общая подготовка Django для сценариев из benchmarks/."""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'api_yamdb'))
+
+
+def setup(settings_module):
+    """Поднимает Django.
+
+    Для SQLite база - новый временный файл с примененными миграциями,
+    PostgreSQL берется из переменных окружения настроек, миграции
+    применяются и к нему.
+    """
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    import django
+    from django.conf import settings
+
+    sqlite = settings.DATABASES['default']['ENGINE'].endswith('sqlite3')
+    if sqlite:
+        settings.DATABASES['default']['NAME'] = os.path.join(
+            tempfile.mkdtemp(), 'bench.sqlite3')
+    settings.ALLOWED_HOSTS = ['*']
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
@@ -0,0 +1,85 @@
+"""Задержка запроса с постоянными соединениями с БД и без них.
+
+Запросы идут через WSGIHandler, как из gunicorn, поэтому сигналы
+request_started/request_finished закрывают или оставляют соединение
+так же, как в контейнере web. Сравниваются CONN_MAX_AGE=0 и
+--max-age секунд.
+
+По умолчанию база - временный SQLite с примененными миграциями.
+Для PostgreSQL задайте --settings=api_yamdb.settings и переменные
+DB_HOST, DB_NAME, POSTGRES_USER, POSTGRES_PASSWORD.
+
+    python -m benchmarks.connections --requests 500
+"""
+import argparse
+import statistics
+import sys
+import time
+from io import BytesIO
+
+from .common import setup
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--settings', default='api_yamdb.settings_test')
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--max-age', type=int, default=60)
+    parser.add_argument('--path', default='/api/v1/categories/')
+    return parser.parse_args()
+
+
+def request(handler, path):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+    response = handler(environ, lambda status, headers: None)
+    b''.join(response)
+    response.close()
+
+
+def run(handler, path, count, max_age):
+    from django.core.cache import caches
+    from django.db import connection
+
+    connection.close()
+    connection.settings_dict['CONN_MAX_AGE'] = max_age
+    timings = []
+    for _ in range(count):
+        # Кэш ответов мерил бы кэш, а не соединения
+        caches['responses'].clear()
+        started = time.perf_counter()
+        request(handler, path)
+        timings.append((time.perf_counter() - started) * 1000)
+    connection.close()
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f'{label:<20} median {statistics.median(timings):7.2f} ms  '
+          f'p95 {p95:7.2f} ms  mean {statistics.mean(timings):7.2f} ms')
+
+
+def main():
+    args = parse_args()
+    setup(args.settings)
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    run(handler, args.path, 10, 0)
+    report('CONN_MAX_AGE=0', run(handler, args.path, args.requests, 0))
+    report(f'CONN_MAX_AGE={args.max_age}',
+           run(handler, args.path, args.requests, args.max_age))
+
+
+if __name__ == '__main__':
+    main()
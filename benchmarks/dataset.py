@@ -0,0 +1,58 @@
+"""Детерминированный синтетический каталог для бенчмарков.
+
+Каталог создает команда generate_catalog, та же, что наполняет базу
+для ручных замеров, поэтому данные бенчмарков от нее не отличаются.
+Одинаковые seed и размеры на пустой базе дают одинаковые строки с
+одинаковыми id, и замеры разных коммитов сравнимы. Сверху добавляются
+администратор и модератор, от имени которых идут сценарии.
+"""
+SCALES = {
+    'small': {'users': 50, 'categories': 5, 'genres': 10, 'titles': 200,
+              'reviews': 2000, 'comments': 4000},
+    'medium': {'users': 500, 'categories': 20, 'genres': 40,
+               'titles': 5000, 'reviews': 50000, 'comments': 100000},
+    'large': {'users': 5000, 'categories': 50, 'genres': 100,
+              'titles': 50000, 'reviews': 500000, 'comments': 1000000},
+}
+ADMIN = 'bench_admin'
+MODERATOR = 'bench_moderator'
+
+
+def username(number):
+    """Имя number-го (с нуля) пользователя из generate_catalog"""
+    from reviews.management.commands import generate_catalog
+    return generate_catalog.username(number + 1)
+
+
+def generate(users, categories, genres, titles, reviews, comments,
+             seed=0):
+    """Наполняет пустую базу, возвращает фактические размеры.
+
+    id начинаются с 1: пользователи username(0)..username(users - 1),
+    за ними администратор и модератор.
+    """
+    from django.core.management import call_command
+
+    from reviews import ratings
+    from reviews.models import Category, Comment, Genre, Review, Title
+    from users.models import User
+
+    if Title.objects.exists() or User.objects.exists():
+        raise RuntimeError('Нужна пустая база')
+    call_command(
+        'generate_catalog', users=users, categories=categories,
+        genres=genres, titles=titles, reviews=reviews, comments=comments,
+        seed=seed, verbosity=0)
+    User.objects.create(username=ADMIN, email='admin@bench.fake',
+                        role='admin')
+    User.objects.create(username=MODERATOR, email='moderator@bench.fake',
+                        role='moderator')
+    ratings.refresh_ranking()
+    return {
+        'users': users,
+        'categories': Category.objects.count(),
+        'genres': Genre.objects.count(),
+        'titles': Title.objects.count(),
+        'reviews': Review.objects.count(),
+        'comments': Comment.objects.count(),
+    }
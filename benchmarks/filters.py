@@ -0,0 +1,151 @@
+"""Фильтры и сортировки списка произведений на большом каталоге.
+
+Каталог создает generate_catalog (по умолчанию миллион произведений).
+Для каждого фильтра из TitleFilter и сортировки из TITLE_ORDERINGS
+выполняются подсчет и первая страница, как в /api/v1/titles/, и
+выводятся медианы времени, число найденных произведений и планы.
+index_driven - в плане подсчета нет полного просмотра reviews_title
+и reviews_title_genre, а страница не сортируется в памяти.
+
+    python -m benchmarks.filters --titles 1000000 --output filters.json
+
+По умолчанию база - временный SQLite. Для локального PostgreSQL:
+--settings=api_yamdb.settings и переменные DB_HOST, DB_NAME,
+POSTGRES_USER, POSTGRES_PASSWORD; база должна быть пустой.
+"""
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+
+from .common import setup
+from .run import git_commit
+
+# Полный просмотр таблицы: Seq Scan в PostgreSQL, SCAN без индекса в SQLite
+FULL_SCAN = re.compile(
+    r'(?:Seq Scan on|\bSCAN(?: TABLE)?) (\w+)\b(?! USING)')
+TABLES = ('reviews_title', 'reviews_title_genre')
+# Сортировка в памяти: узел Sort в PostgreSQL, временное B-дерево в SQLite
+SORT = re.compile(
+    r'(?:^|->)\s*(?:Incremental )?Sort\b|TEMP B-TREE FOR ORDER BY',
+    re.MULTILINE)
+PAGE_SIZE = 10
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--settings', default='api_yamdb.settings_test')
+    parser.add_argument('--titles', type=int, default=1000000)
+    parser.add_argument('--reviews', type=int,
+                        help='по умолчанию столько же, сколько произведений')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='файл для JSON, иначе stdout')
+    return parser.parse_args()
+
+
+def full_scans(plan):
+    """Таблицы из TABLES, которые план читает целиком"""
+    return sorted({table for table in FULL_SCAN.findall(plan)
+                   if table in TABLES})
+
+
+def sorts(plan):
+    return bool(SORT.search(plan))
+
+
+def cases():
+    from reviews.models import Category, Genre
+    category = Category.objects.order_by('pk').first().slug
+    first, second = Genre.objects.order_by('pk').values_list(
+        'slug', flat=True)[:2]
+    return {
+        'year-range': {'year_min': 2000, 'year_max': 2001},
+        'category-year': {'category': category,
+                          'year_min': 1990, 'year_max': 2000},
+        'rating-high': {'rating_min': 9.5},
+        'rating-range': {'rating_min': 6, 'rating_max': 6.5},
+        'genre-any': {'genre': f'{first},{second}'},
+        'genre-all': {'genre_all': f'{first},{second}'},
+        'genre-all-year': {'genre_all': f'{first},{second}',
+                           'year_min': 2000, 'year_max': 2005},
+        'order-rating': {'ordering': 'rating'},
+        'order-rating-desc': {'ordering': '-rating'},
+        'order-year-desc': {'ordering': '-year'},
+        'order-name': {'ordering': 'name'},
+    }
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, round(statistics.median(timings), 2)
+
+
+def measure(params, repeat):
+    from api.filters import TITLE_ORDERINGS, TitleFilter
+    from reviews.models import Title
+
+    queryset = TitleFilter(params, queryset=Title.objects.all()).qs
+    if 'ordering' in params:
+        queryset = queryset.order_by(*TITLE_ORDERINGS[params['ordering']])
+    page = queryset[:PAGE_SIZE]
+    count, count_ms = median_ms(queryset.count, repeat)
+    _, page_ms = median_ms(lambda: list(page.all()), repeat)
+    count_plan = queryset.order_by().values('pk').explain()
+    page_plan = page.explain()
+    return {
+        'params': params,
+        'count': count,
+        'count_ms': count_ms,
+        'page_ms': page_ms,
+        'index_driven': not full_scans(count_plan) and (
+            'ordering' not in params or not sorts(page_plan)),
+        'count_plan': count_plan.splitlines(),
+        'page_plan': page_plan.splitlines(),
+    }
+
+
+def main():
+    args = parse_args()
+    setup(args.settings)
+    from django.core.management import call_command
+    from django.db import connection
+
+    started = time.perf_counter()
+    call_command(
+        'generate_catalog', titles=args.titles,
+        reviews=args.reviews or args.titles, comments=0, seed=args.seed,
+        verbosity=0)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    print(f'Каталог за {time.perf_counter() - started:.1f} с',
+          file=sys.stderr)
+
+    results = {}
+    for name, params in cases().items():
+        results[name] = result = measure(params, args.repeat)
+        print(f'{name:<18} {result["count"]:>8} шт. '
+              f'count {result["count_ms"]:8.2f} мс '
+              f'page {result["page_ms"]:8.2f} мс '
+              f'{"индекс" if result["index_driven"] else "НЕ ПО ИНДЕКСУ"}',
+              file=sys.stderr)
+    output = json.dumps({
+        'meta': {'commit': git_commit(), 'database': connection.vendor,
+                 'titles': args.titles, 'repeat': args.repeat},
+        'results': results,
+    }, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            stream.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Бенчмарк всех маршрутов API на синтетическом каталоге.
+
+Для каждого сценария из benchmarks/scenarios.py выводит перцентили
+задержки, пропускную способность (запросы подряд в одном потоке)
+и число SQL-запросов на запрос. Результат - JSON, который можно
+сравнить с прогоном другого коммита через --baseline.
+
+    python -m benchmarks.run --scale small --output before.json
+    python -m benchmarks.run --scale small --baseline before.json
+
+По умолчанию база - временный SQLite. Для локального PostgreSQL:
+--settings=api_yamdb.settings и переменные DB_HOST, DB_NAME,
+POSTGRES_USER, POSTGRES_PASSWORD; база должна быть пустой.
+"""
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from .common import ROOT, setup
+from .dataset import SCALES
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--settings', default='api_yamdb.settings_test')
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    for name in SCALES['small']:
+        parser.add_argument(f'--{name}', type=int,
+                            help='вместо размера из --scale')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', help='регулярное выражение по имени')
+    parser.add_argument(
+        '--cold-cache', action='store_true',
+        help='очищать кэш перед каждым запросом')
+    parser.add_argument('--output', help='файл для JSON, иначе stdout')
+    parser.add_argument('--baseline', help='JSON прошлого прогона')
+    return parser.parse_args()
+
+
+def percentile(values, rank):
+    """Перцентиль методом ближайшего ранга по отсортированному списку"""
+    index = max(0, -(-len(values) * rank // 100) - 1)
+    return values[index]
+
+
+def summarize(timings, queries, statuses):
+    timings = sorted(timings)
+    summary = {
+        f'p{rank}_ms': round(percentile(timings, rank), 3)
+        for rank in PERCENTILES
+    }
+    summary.update(
+        mean_ms=round(sum(timings) / len(timings), 3),
+        requests_per_second=round(len(timings) / sum(timings) * 1000, 1),
+        queries=round(sum(queries) / len(queries), 2),
+        statuses=dict(Counter(statuses)),
+    )
+    return summary
+
+
+class Runner:
+
+    def __init__(self, context, cold_cache=False):
+        from rest_framework.test import APIClient
+
+        from users.tokens import RoleAccessToken
+
+        self.context = context
+        self.cold_cache = cold_cache
+        self.clients = {'anon': APIClient()}
+        for role, user in context.users().items():
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}')
+            self.clients[role] = client
+
+    def targets(self, scenario, count):
+        if scenario.targets is None:
+            return [None]
+        return scenario.targets(self.context, count)
+
+    def path(self, scenario, i, target):
+        return scenario.path.format(i=i, target=target, **self.context.ids)
+
+    def request(self, scenario, i, target):
+        from django.core.cache import caches
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        path = self.path(scenario, i, target)
+        body = scenario.body(self.context, i) if scenario.body else None
+        send = getattr(self.clients[scenario.user], scenario.method.lower())
+        if self.cold_cache:
+            for cache in caches.all():
+                cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = send(path, body, format='json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = (time.perf_counter() - started) * 1000
+        return elapsed, len(queries), response.status_code
+
+    def run(self, scenario, iterations, warmup):
+        total = warmup + iterations
+        targets = self.targets(scenario, total)
+        timings, queries, statuses = [], [], []
+        for i in range(total):
+            result = self.request(scenario, i, targets[i % len(targets)])
+            if i >= warmup:
+                timings.append(result[0])
+                queries.append(result[1])
+                statuses.append(result[2])
+        return summarize(timings, queries, statuses)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, results):
+    """Таблица изменений p50 и числа запросов относительно baseline"""
+    lines = [f'{"сценарий":<22}{"p50, мс":>20}{"Δ":>9}{"запросы":>16}']
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        before, after = previous['p50_ms'], current['p50_ms']
+        delta = (after - before) / before * 100 if before else 0
+        lines.append(
+            f'{name:<22}{before:>9.2f} -> {after:<8.2f}{delta:>+8.1f}%'
+            f'{previous["queries"]:>7} -> {current["queries"]}')
+    return '\n'.join(lines)
+
+
+def main():
+    args = parse_args()
+    setup(args.settings)
+    import django
+    from django.db import connection
+
+    from . import dataset, scenarios
+
+    sizes = {name: getattr(args, name) or size
+             for name, size in SCALES[args.scale].items()}
+    started = time.perf_counter()
+    sizes = dataset.generate(seed=args.seed, **sizes)
+    print(f'Каталог за {time.perf_counter() - started:.1f} с: {sizes}',
+          file=sys.stderr)
+
+    runner = Runner(scenarios.Context(), args.cold_cache)
+    results = {}
+    for scenario in scenarios.SCENARIOS:
+        if args.only and not re.search(args.only, scenario.name):
+            continue
+        results[scenario.name] = runner.run(
+            scenario, args.iterations, args.warmup)
+        print(f'{scenario.name:<22} p50 '
+              f'{results[scenario.name]["p50_ms"]:8.2f} мс', file=sys.stderr)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'seed': args.seed,
+            'sizes': sizes,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'cold_cache': args.cold_cache,
+        },
+        'results': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            stream.write(output + '\n')
+    else:
+        print(output)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as stream:
+            print(compare(json.load(stream), results), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
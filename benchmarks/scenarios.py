@@ -0,0 +1,176 @@
+"""Сценарии: по одному или несколько на каждый маршрут api/urls.py.
+
+Сценарий - метод, шаблон пути, от чьего имени запрос и тело. Шаблон
+заполняется id из Context и номером итерации i. Сценарии удаления
+берут цели (target) из объектов, созданных сценариями создания,
+поэтому порядок в SCENARIOS важен.
+"""
+from collections import namedtuple
+
+from . import dataset
+
+Scenario = namedtuple(
+    'Scenario', 'name method path user body targets',
+    defaults=(None, None))
+
+ANON, USER, ADMIN = 'anon', 'user', 'admin'
+BULK_SIZE = 10
+
+
+class Context:
+    """id объектов каталога, на которые ссылаются сценарии"""
+
+    def __init__(self):
+        from django.contrib.auth.tokens import default_token_generator
+
+        from reviews.models import Category, Comment, Genre, Review
+        from users.models import User
+
+        comment = Comment.objects.select_related('review').order_by(
+            'pk').first()
+        review = (comment.review if comment
+                  else Review.objects.order_by('pk').first())
+        self.user = User.objects.get(username=dataset.username(0))
+        self.admin = User.objects.get(username=dataset.ADMIN)
+        self.ids = {
+            'title': review.title_id if review else 1,
+            'review': review.pk if review else 0,
+            'comment': comment.pk if comment else 0,
+            'username': self.user.username,
+            'category': Category.objects.order_by('pk')[0].slug,
+            'genre': Genre.objects.order_by('pk')[0].slug,
+        }
+        self.confirmation_code = default_token_generator.make_token(
+            self.user)
+
+    def users(self):
+        return {USER: self.user, ADMIN: self.admin}
+
+
+def _created_users(context, count):
+    from users.models import User
+    return list(User.objects.filter(username__startswith='bench_made')
+                .order_by('pk').values_list('username', flat=True)[:count])
+
+
+def _created_slugs(model_name, prefix):
+    def targets(context, count):
+        from django.apps import apps
+        model = apps.get_model('reviews', model_name)
+        return list(model.objects.filter(slug__startswith=prefix)
+                    .order_by('pk').values_list('slug', flat=True)[:count])
+    return targets
+
+
+def _created_titles(context, count):
+    from reviews.models import Title
+    return list(Title.objects.filter(name__startswith='Бенчмарк')
+                .order_by('pk').values_list('pk', flat=True)[:count])
+
+
+def _titles_without_admin_review(context, count):
+    from reviews.models import Title
+    return list(Title.objects.exclude(reviews__author=context.admin)
+                .order_by('pk').values_list('pk', flat=True)[:count])
+
+
+def _admin_reviews(context, count):
+    from reviews.models import Review
+    return list(Review.objects.filter(author=context.admin)
+                .order_by('pk').values_list('title_id', 'pk')[:count])
+
+
+def _admin_comments(context, count):
+    from reviews.models import Comment
+    return list(Comment.objects.filter(
+        author=context.admin, review_id=context.ids['review'],
+    ).order_by('pk').values_list('pk', flat=True)[:count])
+
+
+def _title(context, i):
+    return {'name': f'Бенчмарк {i}', 'year': 2000,
+            'category': context.ids['category'],
+            'genre': [context.ids['genre']]}
+
+
+CATALOG = '/api/v1/titles/{title}/reviews/{review}'
+SCENARIOS = (
+    Scenario('categories-list', 'GET', '/api/v1/categories/', ANON),
+    Scenario('categories-search', 'GET',
+             '/api/v1/categories/?search=1', ANON),
+    Scenario('genres-list', 'GET', '/api/v1/genres/', ANON),
+    Scenario('genres-search', 'GET', '/api/v1/genres/?search=1', ANON),
+    Scenario('titles-list', 'GET', '/api/v1/titles/', ANON),
+    Scenario('titles-filter', 'GET',
+             '/api/v1/titles/?category={category}&genre={genre}', ANON),
+    Scenario('titles-search', 'GET',
+             '/api/v1/titles/?search=мастер', ANON),
+    Scenario('titles-detail', 'GET', '/api/v1/titles/{title}/', ANON),
+    Scenario('titles-top', 'GET', '/api/v1/titles/top/', ANON),
+    Scenario('titles-stats', 'GET', '/api/v1/titles/{title}/stats/', ANON),
+    Scenario('titles-export', 'GET',
+             '/api/v1/titles/export/?category={category}', ADMIN),
+    Scenario('reviews-list', 'GET', '/api/v1/titles/{title}/reviews/', ANON),
+    Scenario('reviews-keyset', 'GET',
+             '/api/v1/titles/{title}/reviews/?cursor=', ANON),
+    Scenario('reviews-detail', 'GET', CATALOG + '/', ANON),
+    Scenario('comments-list', 'GET', CATALOG + '/comments/', ANON),
+    Scenario('comments-detail', 'GET',
+             CATALOG + '/comments/{comment}/', ANON),
+    Scenario('users-me', 'GET', '/api/v1/users/me/', USER),
+    Scenario('users-list', 'GET', '/api/v1/users/', ADMIN),
+    Scenario('users-detail', 'GET', '/api/v1/users/{username}/', ADMIN),
+    Scenario('cache-stats', 'GET', '/api/v1/cache/stats/', ADMIN),
+    Scenario('outbox-stats', 'GET', '/api/v1/outbox/stats/', ADMIN),
+
+    Scenario('auth-signup', 'POST', '/api/v1/auth/signup/', ANON,
+             lambda context, i: {'username': f'bench_new{i}',
+                                 'email': f'bench_new{i}@bench.fake'}),
+    Scenario('auth-token', 'POST', '/api/v1/auth/token/', ANON,
+             lambda context, i: {
+                 'username': context.ids['username'],
+                 'confirmation_code': context.confirmation_code}),
+    Scenario('users-create', 'POST', '/api/v1/users/', ADMIN,
+             lambda context, i: {'username': f'bench_made{i}',
+                                 'email': f'bench_made{i}@bench.fake'}),
+    Scenario('users-update', 'PATCH', '/api/v1/users/{username}/', ADMIN,
+             lambda context, i: {'bio': f'Обновлено {i}'}),
+    Scenario('users-me-update', 'PATCH', '/api/v1/users/me/', USER,
+             lambda context, i: {'bio': f'Обновлено {i}'}),
+    Scenario('users-delete', 'DELETE', '/api/v1/users/{target}/', ADMIN,
+             targets=_created_users),
+    Scenario('categories-create', 'POST', '/api/v1/categories/', ADMIN,
+             lambda context, i: {'name': f'Бенчмарк {i}',
+                                 'slug': f'bench-category-{i}'}),
+    Scenario('categories-delete', 'DELETE', '/api/v1/categories/{target}/',
+             ADMIN, targets=_created_slugs('Category', 'bench-category-')),
+    Scenario('genres-create', 'POST', '/api/v1/genres/', ADMIN,
+             lambda context, i: {'name': f'Бенчмарк {i}',
+                                 'slug': f'bench-genre-{i}'}),
+    Scenario('genres-delete', 'DELETE', '/api/v1/genres/{target}/', ADMIN,
+             targets=_created_slugs('Genre', 'bench-genre-')),
+    Scenario('titles-create', 'POST', '/api/v1/titles/', ADMIN,
+             lambda context, i: _title(context, i)),
+    Scenario('titles-bulk-create', 'POST', '/api/v1/titles/', ADMIN,
+             lambda context, i: [_title(context, f'{i}-{n}')
+                                 for n in range(BULK_SIZE)]),
+    Scenario('titles-update', 'PATCH', '/api/v1/titles/{title}/', ADMIN,
+             lambda context, i: {'description': f'Обновлено {i}'}),
+    Scenario('titles-delete', 'DELETE', '/api/v1/titles/{target}/', ADMIN,
+             targets=_created_titles),
+    Scenario('reviews-create', 'POST', '/api/v1/titles/{target}/reviews/',
+             ADMIN, lambda context, i: {'text': 'Отзыв', 'score': i % 10 + 1},
+             _titles_without_admin_review),
+    Scenario('reviews-update', 'PATCH', CATALOG + '/', ADMIN,
+             lambda context, i: {'score': i % 10 + 1}),
+    Scenario('comments-create', 'POST', CATALOG + '/comments/', ADMIN,
+             lambda context, i: {'text': f'Комментарий {i}'}),
+    Scenario('comments-update', 'PATCH', CATALOG + '/comments/{comment}/',
+             ADMIN, lambda context, i: {'text': f'Обновлено {i}'}),
+    Scenario('comments-delete', 'DELETE',
+             CATALOG + '/comments/{target}/', ADMIN,
+             targets=_admin_comments),
+    Scenario('reviews-delete', 'DELETE',
+             '/api/v1/titles/{target[0]}/reviews/{target[1]}/', ADMIN,
+             targets=_admin_reviews),
+)
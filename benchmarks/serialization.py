@@ -0,0 +1,108 @@
+"""Сериализаторы DRF против api/rows.py на списках.
+
+Для произведений, отзывов и комментариев берется по --items объектов
+так же, как их читают списки API, и собирается ответ двумя путями:
+ModelSerializer(many=True) по экземплярам моделей и RowBuilder по
+строкам values(). Выводится процессорное время на 1000 объектов
+(медиана из --repeat) вместе с запросами к БД и экономия в процентах.
+
+    python -m benchmarks.serialization --items 1000 --repeat 7
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from .common import setup
+from .run import git_commit
+
+SIZES = {'users': 200, 'categories': 10, 'genres': 20, 'titles': 2000,
+         'reviews': 5000, 'comments': 5000}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--settings', default='api_yamdb.settings_test')
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--output', help='файл для JSON, иначе stdout')
+    return parser.parse_args()
+
+
+def cases():
+    from django.db.models import Prefetch
+
+    from api.serializers import (CommentSerializer, ReviewSerializer,
+                                 TitleReadSerializer)
+    from reviews.models import Comment, Genre, Review, Title
+    return {
+        'titles': (TitleReadSerializer, Title.objects.select_related(
+            'category').prefetch_related(
+                Prefetch('genre', queryset=Genre.objects.order_by('pk')))),
+        'reviews': (ReviewSerializer,
+                    Review.objects.select_related('author')),
+        'comments': (CommentSerializer,
+                     Comment.objects.select_related('author')),
+    }
+
+
+def cpu_ms(function, repeat, items):
+    """Медиана процессорного времени на 1000 объектов"""
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        function()
+        timings.append((time.process_time() - started) * 1000)
+    return round(statistics.median(timings) * 1000 / items, 2)
+
+
+def measure(serializer_class, queryset, items, repeat):
+    from api import rows
+
+    builder = rows.builder(serializer_class)
+    rows_queryset = builder.queryset(queryset)
+
+    def drf():
+        return serializer_class(queryset.all()[:items], many=True).data
+
+    def fast():
+        return builder.build(rows_queryset.all()[:items])
+
+    assert json.dumps(drf()) == json.dumps(fast())
+    drf_ms = cpu_ms(drf, repeat, items)
+    fast_ms = cpu_ms(fast, repeat, items)
+    return {
+        'drf_ms_per_1000': drf_ms,
+        'rows_ms_per_1000': fast_ms,
+        'saving_percent': round((drf_ms - fast_ms) / drf_ms * 100, 1),
+    }
+
+
+def main():
+    args = parse_args()
+    setup(args.settings)
+    from . import dataset
+
+    dataset.generate(**SIZES)
+    results = {}
+    for name, (serializer_class, queryset) in cases().items():
+        results[name] = result = measure(
+            serializer_class, queryset, args.items, args.repeat)
+        print(f'{name:<10} DRF {result["drf_ms_per_1000"]:8.2f} мс '
+              f'rows {result["rows_ms_per_1000"]:8.2f} мс '
+              f'на 1000, -{result["saving_percent"]}%', file=sys.stderr)
+    output = json.dumps({
+        'meta': {'commit': git_commit(), 'items': args.items,
+                 'repeat': args.repeat},
+        'results': results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            stream.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Настройки серверов для benchmarks.asgi.
+
+База из BENCH_DB_ENGINE/BENCH_DB_NAME, кэш ответов выключен, чтобы
+мерить путь до БД. BENCH_DB_DELAY_MS добавляет задержку каждому
+запросу к БД - так локальный SQLite ведет себя как нагруженный
+PostgreSQL.
+"""
+import os
+import time
+
+from django.db.backends.signals import connection_created
+
+from api_yamdb.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': os.environ['BENCH_DB_ENGINE'],
+        'NAME': os.environ['BENCH_DB_NAME'],
+        'USER': os.getenv('POSTGRES_USER', ''),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', ''),
+        'PORT': os.getenv('DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+    }
+}
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                  'LOCATION': 'responses'},
+}
+RESPONSE_CACHE_TIMEOUT = 0
+ALLOWED_HOSTS = ['*']
+DB_DELAY = float(os.getenv('BENCH_DB_DELAY_MS', 0)) / 1000
+
+
+def delay(execute, sql, params, many, context):
+    time.sleep(DB_DELAY)
+    return execute(sql, params, many, context)
+
+
+def add_delay(connection, **kwargs):
+    if DB_DELAY and delay not in connection.execute_wrappers:
+        connection.execute_wrappers.append(delay)
+
+
+connection_created.connect(add_delay)
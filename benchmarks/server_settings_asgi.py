@@ -0,0 +1,13 @@
+"""Настройки ASGI-сервера для benchmarks.asgi: server_settings с
+маршрутами и соединениями, как в api_yamdb.settings_asgi."""
+import os
+
+from .server_settings import *  # noqa: F401,F403
+from .server_settings import DATABASES
+
+ROOT_URLCONF = 'api_yamdb.urls_asgi'
+DATABASES = {
+    alias: dict(database,
+                CONN_MAX_AGE=int(os.getenv('DB_CONN_MAX_AGE', 0)))
+    for alias, database in DATABASES.items()
+}
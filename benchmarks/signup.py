@@ -0,0 +1,104 @@
+"""Запросы к БД при регистрации и выдаче токена.
+
+На --repeat пользователей по очереди: регистрация нового, повторный
+запрос кода и выдача токена. Для каждого случая выводится число
+запросов к БД (без BEGIN и точек сохранения) и медиана времени ответа.
+
+Сравнить с другой версией кода можно тем же скриптом: --source
+указывает каталог api_yamdb другого дерева, например
+
+    git worktree add /tmp/yamdb-before <коммит>
+    python -m benchmarks.signup --source /tmp/yamdb-before/api_yamdb
+    python -m benchmarks.signup
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from .common import setup
+from .run import git_commit
+
+SIGNUP, TOKEN = '/api/v1/auth/signup/', '/api/v1/auth/token/'
+# Управление транзакцией, а не работа с данными
+TRANSACTION = ('BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT',
+               'ROLLBACK TO SAVEPOINT')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--settings', default='api_yamdb.settings_test')
+    parser.add_argument('--source', help='каталог api_yamdb другой версии')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='файл для JSON, иначе stdout')
+    return parser.parse_args()
+
+
+def post(client, path, data):
+    """(число запросов, мс) одного POST"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as captured:
+        started = time.perf_counter()
+        response = client.post(path, data)
+        elapsed = (time.perf_counter() - started) * 1000
+    assert response.status_code == 200, (path, response.content)
+    queries = sum(1 for query in captured
+                  if not query['sql'].upper().startswith(TRANSACTION))
+    return queries, elapsed
+
+
+def measure(repeat):
+    from django.contrib.auth.tokens import default_token_generator
+    from django.test import Client
+
+    from users.models import User
+
+    client = Client()
+    samples = {'signup-new': [], 'signup-repeat': [], 'token': []}
+    for number in range(repeat):
+        data = {'username': f'bench_signup{number}',
+                'email': f'bench_signup{number}@bench.fake'}
+        samples['signup-new'].append(post(client, SIGNUP, data))
+        samples['signup-repeat'].append(post(client, SIGNUP, data))
+        user = User.objects.get(username=data['username'])
+        samples['token'].append(post(client, TOKEN, {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        }))
+    return {
+        name: {
+            'queries': max(queries for queries, _ in values),
+            'p50_ms': round(statistics.median(
+                elapsed for _, elapsed in values), 2),
+        }
+        for name, values in samples.items()
+    }
+
+
+def main():
+    args = parse_args()
+    if args.source:
+        sys.path.insert(0, os.path.abspath(args.source))
+    setup(args.settings)
+    results = measure(args.repeat)
+    for name, result in results.items():
+        print(f'{name:<14} запросов {result["queries"]:3} '
+              f'p50 {result["p50_ms"]:7.2f} мс', file=sys.stderr)
+    output = json.dumps({
+        'meta': {'commit': git_commit(), 'source': args.source,
+                 'repeat': args.repeat},
+        'results': results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            stream.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,91 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import caches
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def make_user(django_user_model):
+    def make(username, role='user'):
+        return django_user_model.objects.create(
+            username=username, email=f'{username}@yamdb.fake', role=role)
+    return make
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user('admin', role='admin')
+
+
+@pytest.fixture
+def client():
+    from rest_framework.test import APIClient
+    return APIClient()
+
+
+@pytest.fixture
+def make_client():
+    def make(user):
+        from rest_framework.test import APIClient
+        from users.tokens import RoleAccessToken
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}')
+        return client
+    return make
+
+
+@pytest.fixture
+def admin_client(admin, make_client):
+    return make_client(admin)
+
+
+@pytest.fixture
+def catalog(make_user):
+    """Наполняет базу: size произведений с жанрами, отзывами и комментариями"""
+    from reviews import ratings
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    def make(size):
+        users = [make_user(f'user{i}') for i in range(size)]
+        categories = [
+            Category.objects.create(name=f'Категория {i}', slug=f'cat-{i}')
+            for i in range(size)
+        ]
+        genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(size)
+        ]
+        titles = []
+        for i in range(size):
+            title = Title.objects.create(
+                name=f'Произведение {i}', year=2000,
+                category=categories[i])
+            title.genre.set(genres)
+            titles.append(title)
+        title = titles[0]
+        reviews = [
+            Review.objects.create(
+                title=title, author=user, text='Отзыв', score=i % 10 + 1)
+            for i, user in enumerate(users)
+        ]
+        review = reviews[0]
+        for user in users:
+            Comment.objects.create(review=review, author=user, text='Ок')
+        ratings.rebuild()
+        return title, review
+    return make
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import resolve
+
+ASGI_URLCONF = 'api_yamdb.urls_asgi'
+
+
+@pytest.fixture
+def asgi(settings):
+    settings.ROOT_URLCONF = ASGI_URLCONF
+    return AsyncClient()
+
+
+def call(method, *args, **kwargs):
+    async def request():
+        return await method(*args, **kwargs)
+    return async_to_sync(request)()
+
+
+def get(client, path, **extra):
+    return call(client.get, path, **extra)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsgi:
+
+    def test_read_routes_are_coroutines(self):
+        for path in ('/api/v1/categories/', '/api/v1/titles/1/',
+                     '/api/v1/titles/1/reviews/1/comments/'):
+            assert asyncio.iscoroutinefunction(
+                resolve(path, ASGI_URLCONF).func), path
+
+    def test_same_responses_as_wsgi(self, asgi, client, catalog):
+        title, review = catalog(2)
+        paths = (
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.pk}/',
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        )
+        for path in paths:
+            expected = client.get(path)
+            response = get(asgi, path)
+            assert response.status_code == expected.status_code == 200
+            assert json.loads(response.content) == expected.json(), path
+
+    def test_writes_and_streaming(self, settings, admin, catalog):
+        from users.tokens import RoleAccessToken
+        catalog(1)
+        settings.ROOT_URLCONF = ASGI_URLCONF
+        client = AsyncClient()
+        # AsyncClient Django 3.2 передает заголовки как есть
+        auth = {'authorization': f'Bearer {RoleAccessToken.for_user(admin)}'}
+        response = call(
+            client.post,
+            '/api/v1/categories/', {'name': 'Новая', 'slug': 'new'},
+            content_type='application/json', **auth)
+        assert response.status_code == 201
+        assert get(client, '/api/v1/titles/export/').status_code == 401
+        # Выгрузка не собирается в памяти: под ASGI ее нет
+        response = get(client, '/api/v1/titles/export/', **auth)
+        assert response.status_code == 501
+        assert 'WSGI' in json.loads(response.content)['detail']
+
+    def test_concurrency_limit(self, settings, catalog):
+        from api import asynchronous
+        catalog(1)
+        settings.ROOT_URLCONF = ASGI_URLCONF
+        client = AsyncClient()
+
+        async def burst():
+            semaphore = asynchronous._semaphore()
+            limit = semaphore._value
+            responses = await asyncio.gather(*(
+                client.get('/api/v1/titles/') for _ in range(limit * 2)))
+            assert semaphore._value == limit
+            return responses
+
+        responses = async_to_sync(burst)()
+        assert {response.status_code for response in responses} == {200}
+
+    def test_instrumentation(self, asgi, catalog):
+        from api import instrumentation
+        title, _ = catalog(1)
+        instrumentation.switch(True)
+        try:
+            response = get(asgi, f'/api/v1/titles/{title.pk}/reviews/')
+        finally:
+            instrumentation.switch(False)
+        assert 'desc="0 queries"' not in response['Server-Timing']
@@ -0,0 +1,66 @@
+import pytest
+from django.urls import get_resolver, resolve
+
+from benchmarks import dataset, scenarios
+from benchmarks.filters import full_scans
+from benchmarks.run import Runner, percentile
+
+SIZES = {'users': 5, 'categories': 2, 'genres': 3, 'titles': 6,
+         'reviews': 12, 'comments': 10}
+
+
+def route_names():
+    """Имена всех маршрутов api, кроме корня роутера и format_suffix"""
+    names = set()
+    for pattern in get_resolver('api.urls').url_patterns:
+        for route in getattr(pattern, 'url_patterns', [pattern]):
+            if route.name and route.name != 'api-root':
+                names.add(route.name)
+    return names
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchmarks:
+
+    def test_dataset_is_deterministic(self):
+        from reviews.models import Category, Genre, Review, Title
+        from users.models import User
+        assert dataset.generate(seed=1, **SIZES) == SIZES
+        titles = list(Title.objects.values_list('name', 'rating_count'))
+        reviews = list(Review.objects.values_list('title_id', 'author_id'))
+        assert sum(count for _, count in titles) == SIZES['reviews']
+        for model in (Category, Genre, Title, User):
+            model.objects.all().delete()
+        dataset.generate(seed=1, **SIZES)
+        assert list(Title.objects.values_list(
+            'name', 'rating_count')) == titles
+        assert list(Review.objects.values_list(
+            'title_id', 'author_id')) == reviews
+
+    def test_every_route_succeeds(self):
+        dataset.generate(**SIZES)
+        runner = Runner(scenarios.Context())
+        covered = set()
+        for scenario in scenarios.SCENARIOS:
+            target = runner.targets(scenario, 1)[0]
+            path = runner.path(scenario, 0, target).split('?')[0]
+            covered.add(resolve(path).url_name)
+            result = runner.run(scenario, iterations=2, warmup=0)
+            assert all(code < 400 for code in result['statuses']), (
+                scenario.name, result['statuses'])
+        assert route_names() <= covered
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([7], 95) == 7
+
+    def test_full_scans(self):
+        assert full_scans(
+            'SEARCH reviews_title USING COVERING INDEX title_year_idx\n'
+            'SCAN reviews_title_genre USING COVERING INDEX x') == []
+        assert full_scans('2 0 0 SCAN reviews_title') == ['reviews_title']
+        assert full_scans(
+            'Hash Join\n  ->  Seq Scan on reviews_title_genre u0\n'
+            '  ->  Seq Scan on reviews_genre') == ['reviews_title_genre']
@@ -0,0 +1,99 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBulkCreate:
+
+    def test_titles(self, admin_client, client, catalog):
+        catalog(2)
+        assert client.get('/api/v1/titles/').json()['count'] == 2
+        response = admin_client.post('/api/v1/titles/', [
+            {'name': 'Первое', 'year': 2001, 'category': 'cat-0',
+             'genre': ['genre-0', 'genre-1']},
+            {'name': 'Второе', 'year': 2002, 'category': 'cat-9',
+             'genre': ['genre-0']},
+            {'name': 'Третье', 'year': 2003, 'category': 'cat-1',
+             'genre': []},
+        ], format='json')
+        assert response.status_code == 207
+        first, second, third = response.json()
+        assert first['status'] == third['status'] == 201
+        assert first['data']['genre'] == ['genre-0', 'genre-1']
+        assert second['status'] == 400
+        assert 'category' in second['errors']
+
+        from reviews.models import Title
+        title = Title.objects.get(pk=first['data']['id'])
+        assert [genre.slug for genre in title.genre.all()] == [
+            'genre-0', 'genre-1']
+        assert client.get('/api/v1/titles/').json()['count'] == 4, (
+            'Кэш списка должен сброситься после массового создания'
+        )
+
+    def test_repeated_genre(self, admin_client, catalog):
+        catalog(1)
+        item = {'name': 'Повтор', 'year': 2000, 'category': 'cat-0',
+                'genre': ['genre-0', 'genre-0']}
+        single = admin_client.post('/api/v1/titles/', item, format='json')
+        assert single.status_code == 201
+        response = admin_client.post('/api/v1/titles/', [item],
+                                     format='json')
+        assert response.status_code == 201, response.json()
+        assert response.json()[0]['data']['genre'] == single.json()['genre']
+
+    def test_size_limit(self, admin_client, settings):
+        settings.BULK_CREATE_MAX_ITEMS = 2
+        item = {'name': 'Т', 'year': 2000, 'category': 'x', 'genre': []}
+        for items in ([], [item] * 3):
+            response = admin_client.post(
+                '/api/v1/titles/', items, format='json')
+            assert response.status_code == 400
+
+    def test_reviews_keep_rating(self, make_user, make_client, catalog):
+        title, review = catalog(1)
+        client = make_client(make_user('reader'))
+        response = client.post(f'/api/v1/titles/{title.pk}/reviews/', [
+            {'text': 'Хорошо', 'score': 9},
+            {'text': 'Еще раз', 'score': 1},
+            {'text': 'Без оценки'},
+        ], format='json')
+        assert response.status_code == 207
+        assert [item['status'] for item in response.json()] == [
+            201, 400, 400]
+        assert response.json()[1]['errors'] == {
+            'non_field_errors': ['Может существовать только один отзыв!']}
+        title.refresh_from_db()
+        assert (title.rating_count, title.rating) == (2, 5.0)
+
+    def test_comments(self, make_user, make_client, catalog):
+        title, review = catalog(1)
+        client = make_client(make_user('reader'))
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        response = client.post(
+            url, [{'text': f'Комментарий {i}'} for i in range(3)],
+            format='json')
+        assert response.status_code == 201
+        assert {item['data']['author'] for item in response.json()} == {
+            'reader'}
+        assert review.comments.filter(author__username='reader').count() == 3
+
+    def test_conflict_reported_per_item(self, make_user, make_client,
+                                        catalog, monkeypatch):
+        from api.views import ReviewViewSet
+        title, review = catalog(1)
+        client = make_client(make_user('reader'))
+        # Как если бы параллельный запрос записал отзыв после проверки
+        monkeypatch.setattr(
+            ReviewViewSet, 'validate_bulk', lambda self, serializers: {})
+        response = client.post(f'/api/v1/titles/{title.pk}/reviews/', [
+            {'text': 'Хорошо', 'score': 9},
+            {'text': 'Еще раз', 'score': 1},
+            {'text': 'Без оценки'},
+        ], format='json')
+        assert response.status_code == 207
+        assert [item['status'] for item in response.json()] == [
+            201, 400, 400]
+        assert response.json()[1]['errors'] == {
+            'non_field_errors': ['Может существовать только один отзыв!']}
+        title.refresh_from_db()
+        assert (title.rating_count, title.rating) == (2, 5.0)
@@ -0,0 +1,99 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    def urls(self, title, review):
+        return (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.pk}/',
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        )
+
+    def test_not_modified_without_serializer(self, client, catalog,
+                                             django_assert_max_num_queries):
+        title, review = catalog(2)
+        for url in self.urls(title, review):
+            response = client.get(url)
+            assert response.status_code == 200
+            etag = response['ETag']
+            # не больше одного легкого запроса за водяным знаком
+            with django_assert_max_num_queries(1):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, url
+            assert response['ETag'] == etag
+            assert not response.content
+
+    def test_non_numeric_pk(self, client):
+        assert client.get('/api/v1/titles/abc/').status_code == 404
+
+    def test_if_modified_since(self, client, catalog):
+        title, _ = catalog(1)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+
+    def test_writes_change_etag(self, client, make_user, make_client,
+                                catalog):
+        title, review = catalog(1)
+        author = make_client(make_user('critic'))
+        urls = self.urls(title, review)
+        etags = {url: client.get(url)['ETag'] for url in urls}
+
+        response = author.post(
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+            {'text': 'Согласен'})
+        assert response.status_code == 201
+        comments_url = urls[-1]
+        assert client.get(
+            comments_url, HTTP_IF_NONE_MATCH=etags[comments_url]
+        ).status_code == 200
+
+        author.post(f'/api/v1/titles/{title.pk}/reviews/',
+                    {'text': 'Хорошо', 'score': 9})
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 200, url
+
+    def test_author_deleted(self, client, admin_client, make_user,
+                            catalog):
+        from reviews.models import Comment
+
+        title, review = catalog(2)
+        # Только комментарий: рейтинг произведения удаление не меняет
+        Comment.objects.create(
+            review=review, author=make_user('critic'), text='Нет')
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        response = client.get(url)
+        assert response.json()['count'] == 3
+
+        assert admin_client.delete(
+            '/api/v1/users/critic/').status_code == 204
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 200
+        assert response.json()['count'] == 2
+
+    def test_author_renamed(self, client, make_client, catalog):
+        from users.models import User
+
+        title, review = catalog(2)
+        urls = self.urls(title, review)[2:]
+        etags = {url: client.get(url)['ETag'] for url in urls}
+
+        response = make_client(User.objects.get(username='user1')).patch(
+            '/api/v1/users/me/', {'username': 'renamed'})
+        assert response.status_code == 200
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 200, url
+            etags[url] = response['ETag']
+
+        User.objects.filter(username='renamed').update(bio='Без имени')
+        User.objects.get(username='renamed').save(update_fields=['bio'])
+        for url in urls:
+            assert client.get(
+                url, HTTP_IF_NONE_MATCH=etags[url]).status_code == 304, url
@@ -0,0 +1,27 @@
+import pytest
+from django.db import connection
+
+from api_yamdb import db
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConnectionHealthCheck:
+
+    def test_broken_connection_is_closed(self, monkeypatch):
+        connection.ensure_connection()
+        closed = []
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        monkeypatch.setattr(connection, 'close', lambda: closed.append(1))
+        db.check_connections()
+        assert closed, 'Неработающее соединение должно закрываться'
+
+    def test_usable_connection_is_kept(self):
+        connection.ensure_connection()
+        raw = connection.connection
+        db.check_connections()
+        assert connection.connection is raw
+
+    def test_receiver_connected(self):
+        from django.core.signals import request_started
+        assert db.check_connections in [
+            receiver() for _, receiver in request_started.receivers]
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from smtplib import SMTPException
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.fixture
+def broken_smtp(monkeypatch):
+    def send_messages(self, messages):
+        raise SMTPException('421 Service not available')
+    monkeypatch.setattr(
+        'django.core.mail.backends.locmem.EmailBackend.send_messages',
+        send_messages)
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_only_enqueues(self, client):
+        from users.models import OutgoingEmail
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'reader', 'email': 'reader@yamdb.fake'})
+        assert response.status_code == 200
+        assert mail.outbox == [], 'Запрос не должен ждать отправки письма'
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'reader@yamdb.fake'
+        assert email.status == OutgoingEmail.PENDING
+
+        call_command('send_emails')
+        assert [message.to for message in mail.outbox] == [
+            ['reader@yamdb.fake']]
+        assert mail.outbox[0].body == email.body
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.SENT
+
+    def test_signup_rolled_back_with_email(self, client, monkeypatch):
+        from users import outbox
+        from users.models import User
+
+        def enqueue(*args):
+            raise RuntimeError('очередь недоступна')
+        monkeypatch.setattr(outbox, 'enqueue', enqueue)
+        with pytest.raises(RuntimeError):
+            client.post('/api/v1/auth/signup/', {
+                'username': 'reader', 'email': 'reader@yamdb.fake'})
+        assert not User.objects.filter(username='reader').exists(), (
+            'Пользователь без письма с кодом не должен сохраняться')
+
+    def test_batch_uses_one_connection(self, monkeypatch):
+        from django.core.mail import get_connection
+        from users import outbox
+        for i in range(5):
+            outbox.enqueue(f'user{i}@yamdb.fake', 'Код', str(i))
+        connections = []
+
+        def connect(*args, **kwargs):
+            connections.append(get_connection(*args, **kwargs))
+            return connections[-1]
+        monkeypatch.setattr(outbox, 'get_connection', connect)
+
+        assert outbox.send_batch(batch_size=10) == 5
+        assert len(connections) == 1
+        assert len(mail.outbox) == 5
+        stats = outbox.stats()
+        assert (stats['depth'], stats[outbox.SENT]) == (0, 5)
+        assert stats['avg_latency_seconds'] is not None
+
+    def test_retry_with_backoff(self, settings, broken_smtp):
+        from users import outbox
+        from users.models import OutgoingEmail
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 3
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 10
+        email = outbox.enqueue('reader@yamdb.fake', 'Код', '123')
+        now = timezone.now()
+
+        assert outbox.send_batch(now=now) == 1
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.next_attempt == now + timedelta(seconds=10)
+        assert 'Service not available' in email.last_error
+        assert outbox.send_batch(now=now) == 0, (
+            'Письмо не должно уходить повторно раньше срока'
+        )
+
+        now = email.next_attempt
+        outbox.send_batch(now=now)
+        email.refresh_from_db()
+        assert email.next_attempt == now + timedelta(seconds=20)
+
+        outbox.send_batch(now=email.next_attempt)
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutgoingEmail.FAILED, 3)
+        stats = outbox.stats()
+        assert (stats['depth'], stats[outbox.RETRIED],
+                stats[outbox.FAILED]) == (0, 2, 1)
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleExport:
+    url = '/api/v1/titles/export/'
+
+    def test_admin_only(self, client, make_user, make_client):
+        assert client.get(self.url).status_code == 401
+        user_client = make_client(make_user('reader'))
+        assert user_client.get(self.url).status_code == 403
+
+    def test_streams_titles_with_reviews(self, admin_client, catalog,
+                                         settings, django_assert_num_queries):
+        settings.EXPORT_CHUNK_SIZE = 4
+        title, review = catalog(10)
+        with django_assert_num_queries(1 + 3 * 2):
+            # курсор по произведениям + жанры и отзывы на каждую
+            # из трех пачек
+            response = admin_client.get(self.url)
+            lines = b''.join(response.streaming_content).splitlines()
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in lines]
+        assert [row['id'] for row in rows] == sorted(
+            row['id'] for row in rows)
+        assert len(rows) == 10
+
+        api_title = admin_client.get(f'/api/v1/titles/{title.pk}/').json()
+        api_reviews = admin_client.get(
+            f'/api/v1/titles/{title.pk}/reviews/', {'limit': 100}
+        ).json()['results']
+        exported = rows[0]
+        assert exported.pop('reviews') == sorted(
+            api_reviews, key=lambda review: review['id'])
+        assert exported == api_title
+
+    def test_genres_in_id_order(self, admin_client, catalog):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        title, _ = catalog(1)
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(self.url)
+            exported = json.loads(b''.join(response.streaming_content))
+        # Порядок задает запрос, а не случайный план БД
+        genre_queries = [query['sql'] for query in queries
+                         if 'FROM "reviews_genre"' in query['sql']]
+        assert genre_queries
+        assert all('ORDER BY "reviews_genre"."id"' in sql
+                   for sql in genre_queries)
+        detail = admin_client.get(f'/api/v1/titles/{title.pk}/').json()
+        assert exported['genre'] == detail['genre']
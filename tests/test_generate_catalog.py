@@ -0,0 +1,61 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Sum
+
+
+def generate(**options):
+    call_command(
+        'generate_catalog', users=20, categories=2, genres=4, titles=50,
+        reviews=400, comments=300, batch_size=64, verbosity=0, **options)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGenerateCatalog:
+
+    def test_skewed_catalog(self):
+        from reviews.models import Comment, Review, Title
+        generate()
+        assert Review.objects.count() == 400
+        assert Comment.objects.count() == 300
+        # unique_review: одна пара произведение-автор
+        assert not Review.objects.values('title', 'author').annotate(
+            n=Count('pk')).filter(n__gt=1).exists()
+        counts = sorted(
+            Title.objects.values_list('rating_count', flat=True),
+            reverse=True)
+        assert counts[0] == 20, 'Горячее произведение набирает всех авторов'
+        assert counts[len(counts) // 2] < 10, 'Длинный хвост'
+        assert Title.objects.aggregate(
+            total=Sum('rating_count'))['total'] == 400
+        assert not Title.objects.filter(genre=None).exists()
+        assert Review.objects.values('pub_date').distinct().count() == 400, (
+            'Даты отзывов из генератора, а не время вставки')
+
+    def test_seed_is_reproducible(self):
+        from reviews.models import Review
+        generate(seed=3)
+        first = list(Review.objects.order_by('pk').values_list(
+            'title_id', 'author_id', 'score'))
+        generate(seed=3)
+        second = list(Review.objects.order_by('pk').values_list(
+            'title_id', 'author_id', 'score'))[len(first):]
+        shift_titles, shift_users = 50, 20
+        assert [(title - shift_titles, author - shift_users, score)
+                for title, author, score in second] == first
+
+    def test_invalid_score_weights(self):
+        with pytest.raises(CommandError):
+            generate(score_weights='1,2,3')
+
+    def test_copy_without_pk(self):
+        from reviews.management.commands.generate_catalog import CopyWriter
+        from reviews.models import Title
+        through = Title.genre.through
+        objs = [through(title_id=1, genre_id=2),
+                through(id=7, title_id=1, genre_id=3)]
+        (first, first_rows), (second, second_rows) = CopyWriter(
+            10).statements(through, objs)
+        assert '"id"' in first and first_rows.read() == '7\t1\t3\n'
+        assert '"id"' not in second
+        assert second.endswith('("title_id", "genre_id") FROM STDIN')
+        assert second_rows.read() == '1\t2\n'
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportCatalog:
+
+    def test_streams_records_in_batches(self, tmp_path, make_user):
+        from reviews.models import Comment, Review, Title
+        make_user('reader')
+        make_user('critic')
+        records = [
+            {'model': 'category', 'name': 'Фильм', 'slug': 'movie'},
+            {'model': 'genre', 'name': 'Драма', 'slug': 'drama'},
+            {'model': 'title', 'id': 7, 'name': 'Тихий Дон', 'year': 1958,
+             'category': 'movie', 'genre': ['drama']},
+            {'model': 'review', 'id': 3, 'title': 7, 'author': 'reader',
+             'text': 'Хорошо', 'score': 8,
+             'pub_date': '2020-01-01T00:00:00Z'},
+            {'model': 'review', 'title': 7, 'author': 'critic',
+             'text': 'Плохо', 'score': 2},
+            {'model': 'comment', 'review': 3, 'author': 'reader',
+             'text': 'Согласен'},
+            {'model': 'users.user', 'pk': 1, 'fields': {}},
+        ]
+        path = tmp_path / 'catalog.json'
+        path.write_text(json.dumps(records), encoding='utf-8')
+
+        call_command('import_catalog', str(path), batch_size=1)
+
+        title = Title.objects.get()
+        assert title.pk == 7
+        assert title.category.slug == 'movie'
+        assert [genre.slug for genre in title.genre.all()] == ['drama']
+        assert (title.rating_count, title.rating) == (2, 5.0), (
+            'Рейтинг должен быть пересчитан после импорта отзывов'
+        )
+        assert Review.objects.get(pk=3).pub_date.year == 2020, (
+            'pub_date из файла не должен перезаписываться'
+        )
+        assert Comment.objects.get().review_id == 3
+        assert Title.objects.create(name='Новое', year=2000).pk > 7
+
+    def test_csv(self, tmp_path):
+        from reviews.models import Genre
+        path = tmp_path / 'genres.csv'
+        path.write_text('name,slug\nДрама,drama\nКомедия,comedy\n',
+                        encoding='utf-8')
+        call_command('import_catalog', str(path), model='genre')
+        assert sorted(Genre.objects.values_list('slug', flat=True)) == [
+            'comedy', 'drama']
+
+    def test_other_writes_keep_auto_dates(self, tmp_path, monkeypatch,
+                                          make_user):
+        from reviews.management.commands import import_catalog
+        from reviews.models import Review, Title
+        make_user('reader')
+        title = Title.objects.create(name='Нос', year=1836)
+        created = []
+
+        def records(stream):
+            yield {'model': 'review', 'id': 10, 'title': title.pk,
+                   'author': 'reader', 'text': 'Из файла', 'score': 5,
+                   'pub_date': '2020-01-01T00:00:00Z'}
+            # Запись не из импорта, пока он идет
+            created.append(Review.objects.create(
+                title=title, author=make_user('critic'), text='Из API',
+                score=7))
+
+        monkeypatch.setitem(import_catalog.READERS, 'json', records)
+        path = tmp_path / 'catalog.json'
+        path.write_text('[]', encoding='utf-8')
+        call_command('import_catalog', str(path))
+
+        assert created[0].pub_date is not None
+        assert Review.objects.get(pk=10).pub_date.year == 2020
+
+    def test_conflicts_keep_existing_dates(self, tmp_path, make_user):
+        from reviews.models import Review, Title
+        make_user('reader')
+        title = Title.objects.create(name='Нос', year=1836)
+        review = Review.objects.create(
+            title=title, author=make_user('critic'), text='Был', score=3)
+        path = tmp_path / 'reviews.ndjson'
+        path.write_text(json.dumps({
+            'model': 'review', 'id': review.pk, 'title': title.pk,
+            'author': 'reader', 'text': 'Дубль', 'score': 9,
+            'pub_date': '2001-01-01T00:00:00Z'}) + '\n', encoding='utf-8')
+        call_command('import_catalog', str(path), ignore_conflicts=True)
+        assert Review.objects.get(pk=review.pk).pub_date == review.pub_date
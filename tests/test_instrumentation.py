@@ -0,0 +1,59 @@
+import json
+import logging
+
+import pytest
+from django.core.management import call_command
+
+from api import instrumentation
+
+
+@pytest.fixture
+def instrumented():
+    instrumentation.switch(True)
+    yield
+    instrumentation.switch(False)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestInstrumentation:
+
+    def test_off_by_default(self, client, catalog):
+        catalog(1)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'Server-Timing' not in response
+
+    def test_server_timing_and_log(self, client, catalog, instrumented,
+                                   caplog):
+        catalog(2)
+        with caplog.at_level(logging.INFO, logger='api.performance'):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        timing = response['Server-Timing']
+        assert timing.startswith('db;dur=')
+        assert 'serializer;dur=' in timing and 'total;dur=' in timing
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['view'] == 'api.views.TitleViewSet.list'
+        assert record['queries'] >= 1
+        assert record['serializer_ms'] > 0
+        assert record['total_ms'] >= record['db_ms']
+
+    def test_slow_query_log(self, client, catalog, instrumented, settings,
+                            caplog):
+        catalog(1)
+        settings.PERF_SLOW_QUERY_MS = 0
+        with caplog.at_level(logging.WARNING, logger='api.slow_queries'):
+            client.get('/api/v1/categories/')
+        records = [json.loads(record.getMessage())
+                   for record in caplog.records
+                   if record.name == 'api.slow_queries']
+        assert records
+        assert all(record['view'] == 'api.views.CategoryViewSet.list'
+                   for record in records)
+        assert 'reviews_category' in records[-1]['sql']
+
+    def test_switch_command(self, client):
+        call_command('instrumentation', 'on')
+        assert 'Server-Timing' in client.get('/api/v1/categories/')
+        call_command('instrumentation', 'off')
+        assert 'Server-Timing' not in client.get('/api/v1/categories/')
@@ -0,0 +1,50 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestNestedRoutes:
+
+    def test_parent_must_match_url(self, client, catalog):
+        from reviews.models import Title
+        title, review = catalog(2)
+        other = Title.objects.exclude(pk=title.pk).get()
+        comment = review.comments.first()
+        urls = (
+            f'/api/v1/titles/{other.pk}/reviews/{review.pk}/',
+            f'/api/v1/titles/{other.pk}/reviews/{review.pk}/comments/',
+            f'/api/v1/titles/{other.pk}/reviews/{review.pk}/comments/'
+            f'{comment.pk}/',
+        )
+        for url in urls:
+            assert client.get(url).status_code == 404, (
+                f'Отзыв чужого произведения должен давать 404: {url}'
+            )
+        assert client.get(
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+            f'{comment.pk}/').status_code == 200
+
+    def test_non_numeric_pk(self, client, catalog):
+        title, review = catalog(1)
+        for url in (
+            f'/api/v1/titles/{title.pk}/reviews/abc/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/abc/',
+        ):
+            assert client.get(url).status_code == 404, url
+
+    def test_duplicate_review(self, make_user, make_client, catalog,
+                              django_assert_num_queries):
+        title, _ = catalog(1)
+        client = make_client(make_user('reader'))
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        assert client.post(
+            url, {'text': 'Первый', 'score': 5}).status_code == 201
+        # произведение + отказ INSERT по unique_review + проверка
+        # причины отказа; в тесте INSERT еще и в точке сохранения,
+        # которую после ошибки откатывают и освобождают
+        with django_assert_num_queries(6):
+            response = client.post(url, {'text': 'Второй', 'score': 1})
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Может существовать только один отзыв!']}
+        title.refresh_from_db()
+        assert (title.rating_count, title.rating_sum) == (2, 6)
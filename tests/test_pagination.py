@@ -0,0 +1,91 @@
+from base64 import b64encode
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+
+def cursor(query):
+    return b64encode(query.encode()).decode()
+
+
+@pytest.fixture
+def reviews(make_user):
+    """Семь отзывов, у трех одинаковый pub_date"""
+    from reviews.models import Review, Title
+    title = Title.objects.create(name='Нос', year=1836)
+    now = timezone.now()
+    dates = [now - timedelta(days=day) for day in (1, 2, 3, 3, 3, 4, 5)]
+    for number, pub_date in enumerate(dates):
+        review = Review.objects.create(
+            title=title, author=make_user(f'user{number}'), text='Отзыв',
+            score=5)
+        Review.objects.filter(pk=review.pk).update(pub_date=pub_date)
+    return f'/api/v1/titles/{title.pk}/reviews/'
+
+
+def ids(response):
+    assert response.status_code == 200, response.content
+    return [review['id'] for review in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestKeysetPagination:
+
+    def test_forward_and_backward_match_offset(self, client, reviews):
+        expected = ids(client.get(reviews, {'limit': 100}))
+        assert len(expected) == 7
+
+        pages, url, params = [], reviews, {'limit': 3, 'cursor': ''}
+        while url:
+            response = client.get(url, params)
+            pages.append(ids(response))
+            url, params = response.json()['next'], None
+        assert pages == [expected[:3], expected[3:6], expected[6:]]
+        assert response.json()['previous'] is not None
+
+        backward = []
+        url = response.json()['previous']
+        while url:
+            response = client.get(url)
+            backward.insert(0, ids(response))
+            url = response.json()['previous']
+        assert sum(backward, []) == expected[:6]
+
+    def test_ties_broken_by_pk(self, client, reviews):
+        from django.db.models import Count
+        from reviews.models import Review
+        tied_date = Review.objects.values('pub_date').annotate(
+            n=Count('pk')).get(n=3)['pub_date']
+        tied = sorted(Review.objects.filter(
+            pub_date=tied_date).values_list('pk', flat=True), reverse=True)
+
+        seen = []
+        url, params = reviews, {'limit': 1, 'cursor': ''}
+        while url:
+            response = client.get(url, params)
+            seen.extend(ids(response))
+            url, params = response.json()['next'], None
+        assert len(seen) == len(set(seen)) == 7, 'Без пропусков и повторов'
+        assert [pk for pk in seen if pk in tied] == tied
+
+    @pytest.mark.parametrize('value', (
+        'не base64',
+        cursor('r=0&p=x'),
+        cursor('r=0&p=2020-01-01T00:00:00|pk'),
+        cursor('r=1&p=2020-13-45T00:00:00|1'),
+        cursor('r=0&p=|1'),
+    ))
+    def test_bad_cursor(self, client, reviews, value):
+        response = client.get(reviews, {'cursor': value})
+        assert response.status_code == 404
+
+    def test_offset_without_cursor(self, client, reviews):
+        body = client.get(reviews, {'limit': 2, 'offset': 2}).json()
+        assert body['count'] == 7
+        assert 'offset=4' in body['next']
+        assert 'cursor' not in body['next']
+
+        body = client.get(reviews, {'limit': 2, 'cursor': ''}).json()
+        assert 'count' not in body
+        assert 'cursor=' in body['next']
@@ -0,0 +1,91 @@
+import pytest
+
+SIZES = (1, 10)
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    """Число запросов к БД не зависит от размера страницы"""
+
+    @pytest.mark.parametrize('size', SIZES)
+    @pytest.mark.parametrize('url, queries', (
+        # COUNT(*) + страница
+        ('/api/v1/categories/', 2),
+        ('/api/v1/genres/', 2),
+        # + жанры одним prefetch
+        ('/api/v1/titles/', 3),
+        # + само произведение или отзыв
+        ('/api/v1/titles/{title}/reviews/', 3),
+        ('/api/v1/titles/{title}/reviews/{review}/comments/', 3),
+    ))
+    def test_list(self, client, catalog, django_assert_num_queries,
+                  size, url, queries):
+        title, review = catalog(size)
+        url = url.format(title=title.pk, review=review.pk)
+        with django_assert_num_queries(queries):
+            response = client.get(url, {'limit': size})
+        assert response.status_code == 200
+        assert len(response.json()['results']) == size
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_detail(self, client, catalog, django_assert_num_queries, size):
+        title, review = catalog(size)
+        urls = (
+            # modified для ETag + произведение + жанры
+            (f'/api/v1/titles/{title.pk}/', 3),
+            # объект вместе с родителями одним JOIN
+            (f'/api/v1/titles/{title.pk}/reviews/{review.pk}/', 1),
+            (f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+             f'{review.comments.first().pk}/', 1),
+        )
+        for url, queries in urls:
+            with django_assert_num_queries(queries):
+                assert client.get(url).status_code == 200
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_users(self, admin_client, catalog, django_assert_num_queries,
+                   size):
+        catalog(size)
+        # COUNT(*) + страница, пользователь берется из токена
+        with django_assert_num_queries(2):
+            response = admin_client.get('/api/v1/users/', {'limit': size})
+        assert len(response.json()['results']) == size
+        with django_assert_num_queries(1):
+            assert admin_client.get('/api/v1/users/user0/').status_code == 200
+        # me читает пользователя из БД, UserSerializer отдает еще
+        # его группы и права
+        with django_assert_num_queries(3):
+            assert admin_client.get('/api/v1/users/me/').status_code == 200
+
+    def test_signup_and_token(self, client, django_assert_num_queries):
+        from django.contrib.auth.tokens import default_token_generator
+        from users.models import User
+        data = {'username': 'reader', 'email': 'reader@yamdb.fake'}
+        # поиск по имени или почте + INSERT пользователя в точке
+        # сохранения + письмо в очередь; в тесте вся запись еще и во
+        # внешней точке сохранения (SAVEPOINT и RELEASE)
+        with django_assert_num_queries(7):
+            assert client.post(
+                '/api/v1/auth/signup/', data).status_code == 200
+        # повторный запрос кода: пользователь уже найден проверкой,
+        # письмо в той же внешней точке сохранения
+        with django_assert_num_queries(4):
+            assert client.post(
+                '/api/v1/auth/signup/', data).status_code == 200
+        with django_assert_num_queries(1):
+            response = client.post('/api/v1/auth/signup/', {
+                'username': 'other', 'email': 'reader@yamdb.fake'})
+        assert response.status_code == 400
+
+        user = User.objects.get(username='reader')
+        with django_assert_num_queries(1):
+            response = client.post('/api/v1/auth/token/', {
+                'username': 'reader',
+                'confirmation_code':
+                    default_token_generator.make_token(user),
+            })
+        assert response.status_code == 200
+        with django_assert_num_queries(1):
+            response = client.post('/api/v1/auth/token/', {
+                'username': 'nobody', 'confirmation_code': 'x'})
+        assert response.status_code == 404
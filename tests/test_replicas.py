@@ -0,0 +1,87 @@
+import pytest
+from django.db import OperationalError, connections
+from django.test.utils import CaptureQueriesContext
+
+from api_yamdb import replicas
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICAS = {'replica': 1}
+    replicas._down.clear()
+    yield connections['replica']
+    replicas._down.clear()
+
+
+def captured(alias):
+    return CaptureQueriesContext(connections[alias])
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+class TestReplicaRouting:
+
+    def test_safe_methods_read_from_replica(self, replica, client, catalog):
+        title, _ = catalog(1)
+        with captured('default') as primary, captured('replica') as queries:
+            response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.status_code == 200
+        assert queries.captured_queries
+        assert not primary.captured_queries
+
+    def test_writes_go_to_primary(self, replica, admin_client):
+        with captured('replica') as queries:
+            response = admin_client.post(
+                '/api/v1/categories/', {'name': 'Кино', 'slug': 'films'})
+        assert response.status_code == 201
+        assert not queries.captured_queries
+
+    def test_reads_after_write_stay_on_primary(self, replica, admin_client,
+                                               settings):
+        response = admin_client.post(
+            '/api/v1/categories/', {'name': 'Кино', 'slug': 'films'})
+        cookie = response.cookies[replicas.PIN_COOKIE]
+        assert cookie['max-age'] == settings.REPLICA_READ_AFTER_WRITE
+        with captured('replica') as queries:
+            response = admin_client.get('/api/v1/categories/')
+        assert response.json()['count'] == 1
+        assert not queries.captured_queries
+
+        del admin_client.cookies[replicas.PIN_COOKIE]
+        with captured('replica') as queries:
+            admin_client.get('/api/v1/categories/?search=Кино')
+        assert queries.captured_queries
+
+    def test_failed_write_does_not_pin(self, replica, admin_client):
+        response = admin_client.post('/api/v1/categories/', {'name': ''})
+        assert response.status_code == 400
+        assert replicas.PIN_COOKIE not in response.cookies
+
+    def test_unusable_replica_is_skipped(self, replica, client, monkeypatch):
+        def refuse():
+            raise OperationalError('replica is down')
+
+        monkeypatch.setattr(replica, 'ensure_connection', refuse)
+        with captured('default') as primary:
+            response = client.get('/api/v1/genres/')
+        assert response.status_code == 200
+        assert primary.captured_queries
+        assert 'replica' in replicas._down
+
+        monkeypatch.undo()
+        assert replicas.choose_replica() is None, (
+            'Реплика исключается до истечения REPLICA_RETRY_AFTER')
+
+
+class TestReplicaChoice:
+
+    def test_weights(self, settings, monkeypatch):
+        settings.DATABASE_REPLICAS = {'first': 3, 'second': 1, 'off': 0}
+        monkeypatch.setattr(replicas, 'usable', lambda alias: True)
+        monkeypatch.setattr(replicas, '_down', {})
+        chosen = [replicas.choose_replica() for _ in range(2000)]
+        assert 'off' not in chosen
+        assert 0.65 < chosen.count('first') / len(chosen) < 0.85
+
+    def test_no_replicas(self, settings):
+        settings.DATABASE_REPLICAS = {}
+        assert replicas.choose_replica() is None
@@ -0,0 +1,68 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_hit_skips_database(self, client, catalog,
+                                django_assert_num_queries):
+        catalog(3)
+        for url in ('/api/v1/categories/', '/api/v1/genres/',
+                    '/api/v1/titles/'):
+            first = client.get(url)
+            assert first['X-Cache'] == 'MISS'
+            with django_assert_num_queries(0):
+                second = client.get(url)
+            assert second['X-Cache'] == 'HIT'
+            assert second.json() == first.json()
+            other_page = client.get(url, {'limit': 1})
+            assert other_page['X-Cache'] == 'MISS', (
+                'Проверьте, что строка запроса входит в ключ кэша'
+            )
+
+    def test_category_write_invalidates_lists(self, client, admin_client,
+                                              catalog):
+        catalog(1)
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/titles/')
+        admin_client.post(
+            '/api/v1/categories/', {'name': 'Книга', 'slug': 'book'})
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 2
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS'
+
+    def test_review_invalidates_titles(self, client, make_user, make_client,
+                                       catalog):
+        title, _ = catalog(1)
+        client.get('/api/v1/titles/')
+        author = make_client(make_user('critic'))
+        author.post(f'/api/v1/titles/{title.pk}/reviews/',
+                    {'text': 'Плохо', 'score': 1})
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['results'][0]['rating'] == 1
+
+    def test_stats(self, client, admin_client, catalog):
+        catalog(1)
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        assert client.get('/api/v1/cache/stats/').status_code == 401
+        stats = admin_client.get('/api/v1/cache/stats/').json()
+        assert stats['genres'] == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+    def test_eviction_keeps_counters_and_versions(self, client, admin_client,
+                                                  catalog):
+        from django.core.cache import caches
+        from api import cache
+        from reviews import versions
+        catalog(1)
+        client.get('/api/v1/genres/')
+        before = versions.get_versions(versions.GENRES)
+        # Больше, чем вмещает кэш по умолчанию: старые записи вытесняются
+        for number in range(400):
+            cache.save(f'response:genres:fill:{number}', b'{}')
+        assert caches['responses'].get('response:genres:fill:399')
+        assert versions.get_versions(versions.GENRES) == before
+        stats = admin_client.get('/api/v1/cache/stats/').json()
+        assert stats['genres']['misses'] == 1
@@ -0,0 +1,91 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture
+def varied_catalog(catalog, make_user):
+    """Каталог с пустыми связями, NULL и дробным рейтингом"""
+    from reviews import ratings
+    from reviews.models import Comment, Genre, Review, Title
+
+    title, review = catalog(3)
+    late = Genre.objects.create(name='Поздний', slug='late')
+    bare = Title.objects.create(name='Без связей', year=1999)
+    mixed = Title.objects.create(
+        name='Смешанный', year=2001, description='Описание\nв две строки')
+    mixed.genre.set([late, *Genre.objects.order_by('-pk')[1:3]])
+    critic = make_user('critic')
+    for score, author in ((7, critic), (8, review.author)):
+        Review.objects.create(
+            title=mixed, author=author, text='Оценка', score=score)
+    Comment.objects.create(review=review, author=critic, text='"Кавычки"')
+    ratings.rebuild()
+    return title, review, bare, mixed
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRowSerialization:
+
+    def both(self, client, settings, url, params=None):
+        responses = []
+        for fast in (False, True):
+            settings.FAST_LIST_SERIALIZATION = fast
+            caches['responses'].clear()
+            response = client.get(url, params)
+            assert response.status_code == 200, response.content
+            responses.append(response.content)
+        return responses
+
+    def test_titles_identical(self, client, settings, varied_catalog):
+        title, *_ = varied_catalog
+        for params in ({}, {'limit': 100}, {'offset': 2, 'limit': 3},
+                       {'ordering': '-rating'}, {'search': 'произведение'},
+                       {'genre': 'late,genre-0'}, {'fields': 'name,genre'},
+                       {'omit': 'category,description'}):
+            slow, fast = self.both(client, settings, '/api/v1/titles/',
+                                   params)
+            assert fast == slow, params
+
+    def test_reviews_and_comments_identical(self, client, settings,
+                                            varied_catalog):
+        title, review, _, mixed = varied_catalog
+        urls = (
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{mixed.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        )
+        for url in urls:
+            for params in ({}, {'cursor': ''}, {'limit': 2, 'cursor': ''},
+                           {'fields': 'author,pub_date'}):
+                slow, fast = self.both(client, settings, url, params)
+                assert fast == slow, (url, params)
+
+    def test_keyset_next_page(self, client, settings, varied_catalog):
+        title, *_ = varied_catalog
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        settings.FAST_LIST_SERIALIZATION = True
+        first = client.get(url, {'limit': 2, 'cursor': ''}).json()
+        second = client.get(first['next']).json()
+        settings.FAST_LIST_SERIALIZATION = False
+        assert client.get(first['next']).json() == second
+
+    def test_same_number_of_queries(self, client, settings, varied_catalog):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        counts = []
+        for fast in (False, True):
+            settings.FAST_LIST_SERIALIZATION = fast
+            caches['responses'].clear()
+            with CaptureQueriesContext(connection) as queries:
+                client.get('/api/v1/titles/')
+            counts.append(len(queries))
+        assert counts[1] <= counts[0]
+
+    def test_builders_cover_list_serializers(self):
+        from api import rows
+        from api.serializers import (CommentSerializer, ReviewSerializer,
+                                     TitleReadSerializer)
+        for serializer in (TitleReadSerializer, ReviewSerializer,
+                           CommentSerializer):
+            assert rows.builder(serializer) is not None, serializer
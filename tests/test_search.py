@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleSearch:
+
+    def search(self, client, query):
+        response = client.get('/api/v1/titles/', {'search': query})
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    def test_ranked_prefix_search(self, client):
+        from reviews.models import Title
+        Title.objects.create(
+            name='Тихий Дон', year=2000, description='Роман о казаках')
+        Title.objects.create(
+            name='Казаки', year=2000, description='Повесть Толстого')
+        Title.objects.create(name='Война и мир', year=2000)
+
+        assert self.search(client, 'казак') == ['Казаки', 'Тихий Дон'], (
+            'Совпадение в названии должно быть выше совпадения в описании'
+        )
+        assert self.search(client, 'тих роман') == ['Тихий Дон']
+        assert self.search(client, 'чапаев') == []
+        assert self.search(client, '!!!') == []
+
+    def test_index_follows_writes(self, client):
+        from reviews.models import Title
+        title = Title.objects.create(name='Старое имя', year=2000)
+        title.name = 'Новое имя'
+        title.save()
+        assert self.search(client, 'старое') == []
+        assert self.search(client, 'новое') == ['Новое имя']
+        title.delete()
+        assert self.search(client, 'новое') == []
@@ -9,3 +9,16 @@ class TestSettings:
         assert settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql', (
             'Проверьте, что используете базу данных postgresql'
         )
+
+    def test_asgi_settings(self, monkeypatch):
+        import importlib
+        monkeypatch.delenv('DB_CONN_MAX_AGE', raising=False)
+        from api_yamdb import settings_asgi
+        settings_asgi = importlib.reload(settings_asgi)
+        assert settings.ROOT_URLCONF == 'api_yamdb.urls'
+        assert settings_asgi.ROOT_URLCONF == 'api_yamdb.urls_asgi'
+        assert settings_asgi.DATABASES['default']['CONN_MAX_AGE'] == 0
+
+    def test_fast_list_serialization_is_opt_in(self):
+        assert not settings.FAST_LIST_SERIALIZATION, (
+            'Быстрый путь списков включается только через окружение')
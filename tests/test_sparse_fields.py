@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def get(client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    return response, [query['sql'] for query in queries.captured_queries]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSparseFields:
+
+    def test_titles_fields(self, client, catalog):
+        catalog(2)
+        response, full = get(client, '/api/v1/titles/')
+        response, queries = get(
+            client, '/api/v1/titles/', fields='id,name,rating')
+        assert response.status_code == 200
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'rating'}
+        assert len(queries) == len(full) - 1, (
+            'Жанры без поля genre не догружаются')
+        assert 'description' not in queries[-1]
+        assert 'reviews_category' not in queries[-1]
+
+    def test_titles_omit(self, client, catalog):
+        title, _ = catalog(1)
+        response, queries = get(
+            client, f'/api/v1/titles/{title.pk}/', omit='description,genre')
+        assert set(response.json()) == {
+            'id', 'name', 'year', 'rating', 'category'}
+        assert response.json()['category'] == {
+            'name': 'Категория 0', 'slug': 'cat-0'}
+        assert not any('reviews_genre' in sql for sql in queries)
+
+    def test_reviews_and_comments(self, client, catalog):
+        title, review = catalog(3)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        _, full = get(client, url)
+        response, queries = get(client, url, fields='text,author')
+        assert [set(item) for item in response.json()['results']] == [
+            {'text', 'author'}] * 3
+        assert len(queries) == len(full), 'Без запроса на каждый отзыв'
+
+        response, queries = get(client, url, fields='text', cursor='')
+        assert response.status_code == 200
+        assert 'pub_date' in queries[-1], 'pub_date нужен для курсора'
+        assert 'users_user' not in queries[-1]
+
+        response, queries = get(
+            client, f'{url}{review.pk}/comments/', omit='author,pub_date')
+        assert {'id', 'text'} == set(response.json()['results'][0])
+        assert 'users_user' not in queries[-1]
+
+    def test_review_and_comment_detail(self, client, catalog):
+        title, review = catalog(1)
+        comment = review.comments.first()
+        for url, table in (
+            (f'/api/v1/titles/{title.pk}/reviews/{review.pk}/',
+             'reviews_review'),
+            (f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+             f'{comment.pk}/', 'reviews_comment'),
+        ):
+            _, full = get(client, url)
+            response, queries = get(client, url, fields='id,pub_date')
+            assert response.status_code == 200
+            assert set(response.json()) == {'id', 'pub_date'}
+            assert len(queries) == len(full) == 1, (
+                'Объект и родители по-прежнему одним запросом')
+            assert f'"{table}"."text"' in full[0]
+            assert f'"{table}"."text"' not in queries[0], url
+            assert 'users_user' not in queries[0]
+            etag = client.get(url, {'fields': 'id'})['ETag']
+            assert client.get(url, {'fields': 'id'},
+                              HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_users(self, admin_client):
+        response = admin_client.get('/api/v1/users/', {'fields': 'username'})
+        assert response.json()['results'] == [{'username': 'admin'}]
+
+    def test_unknown_field(self, client):
+        response = client.get('/api/v1/genres/', {'fields': 'name,votes'})
+        assert response.status_code == 400
+        assert response.json() == {'fields': ['Неизвестные поля: votes']}
+
+    def test_writes_ignore_fields(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/?fields=slug',
+            {'name': 'Кино', 'slug': 'films'})
+        assert response.status_code == 201
+        assert response.json() == {'name': 'Кино', 'slug': 'films'}
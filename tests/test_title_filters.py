@@ -0,0 +1,95 @@
+import pytest
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Category, Genre, Title
+
+    books = Category.objects.create(name='Книги', slug='books')
+    drama, comedy, horror = (
+        Genre.objects.create(name=slug, slug=slug)
+        for slug in ('drama', 'comedy', 'horror'))
+    rows = (
+        ('Гамлет', 1600, books, 9.0, (drama,)),
+        ('Ревизор', 1836, books, 7.5, (drama, comedy)),
+        ('Оно', 1986, None, 6.0, (horror,)),
+        ('Без оценок', 2020, books, None, (comedy, horror)),
+    )
+    for name, year, category, rating, genres in rows:
+        title = Title.objects.create(
+            name=name, year=year, category=category)
+        Title.objects.filter(pk=title.pk).update(rating=rating)
+        title.genre.set(genres)
+
+
+def names(client, **params):
+    response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200, response.json()
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleFilters:
+
+    def names(self, client, **params):
+        return sorted(names(client, **params))
+
+    def test_year_range(self, client, titles):
+        assert self.names(client, year_min=1800, year_max=1990) == [
+            'Оно', 'Ревизор']
+        assert self.names(client, category='books', year_min=1700) == [
+            'Без оценок', 'Ревизор']
+        assert self.names(client, year=1600) == ['Гамлет']
+
+    def test_rating_range(self, client, titles):
+        assert self.names(client, rating_min=7.5) == ['Гамлет', 'Ревизор']
+        assert self.names(client, rating_min=6, rating_max=8) == [
+            'Оно', 'Ревизор']
+
+    def test_any_genre_without_duplicates(self, client, titles):
+        response = client.get('/api/v1/titles/', {'genre': 'drama,comedy'})
+        assert response.json()['count'] == 3
+        assert self.names(client, genre='drama,comedy') == [
+            'Без оценок', 'Гамлет', 'Ревизор']
+        assert self.names(client, genre='horror') == ['Без оценок', 'Оно']
+
+    def test_all_genres(self, client, titles):
+        assert self.names(client, genre_all='drama,comedy') == ['Ревизор']
+        assert self.names(client, genre_all='comedy,horror',
+                          year_max=2000) == []
+        assert self.names(client, genre_all='drama,drama') == [
+            'Гамлет', 'Ревизор']
+
+    def test_invalid_range(self, client, titles):
+        response = client.get('/api/v1/titles/', {'rating_min': 'много'})
+        assert response.status_code == 400
+        assert 'rating_min' in response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleOrdering:
+
+    def test_default_order_is_pk(self, client, titles):
+        assert names(client) == ['Гамлет', 'Ревизор', 'Оно', 'Без оценок']
+        assert names(client, ordering='unknown') == names(client)
+
+    def test_year_and_name(self, client, titles):
+        assert names(client, ordering='-year') == [
+            'Без оценок', 'Оно', 'Ревизор', 'Гамлет']
+        assert names(client, ordering='name') == [
+            'Без оценок', 'Гамлет', 'Оно', 'Ревизор']
+
+    def test_rating_puts_unrated_last(self, client, titles):
+        assert names(client, ordering='rating') == [
+            'Оно', 'Ревизор', 'Гамлет', 'Без оценок']
+        assert names(client, ordering='-rating') == [
+            'Гамлет', 'Ревизор', 'Оно', 'Без оценок']
+
+    def test_ties_broken_by_pk(self, client):
+        from reviews.models import Title
+        pks = [Title.objects.create(name='Двойник', year=1846).pk
+               for _ in range(3)]
+        for ordering, expected in (('name', pks), ('-name', pks[::-1])):
+            response = client.get('/api/v1/titles/', {'ordering': ordering})
+            assert [title['id'] for title in response.json()['results']] == (
+                expected)
@@ -0,0 +1,61 @@
+import pytest
+
+
+def histogram_from_reviews(title):
+    from django.db.models import Count
+    counts = dict(title.reviews.order_by().values_list('score').annotate(
+        total=Count('pk')))
+    return {str(score): counts.get(score, 0) for score in range(1, 11)}
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_stats(self, client, catalog, django_assert_num_queries):
+        title, _ = catalog(4)
+        url = f'/api/v1/titles/{title.pk}/stats/'
+        # modified для ETag + строки гистограммы
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.json() == {
+            'count': 4, 'mean': 2.5, 'median': 2.5,
+            'histogram': histogram_from_reviews(title),
+        }
+        assert client.get('/api/v1/titles/0/stats/').status_code == 404
+        assert client.get('/api/v1/titles/abc/stats/').status_code == 404
+
+    def test_follows_review_writes(self, client, make_user, make_client,
+                                   catalog):
+        from reviews import ratings
+        title, _ = catalog(3)
+        url = f'/api/v1/titles/{title.pk}/stats/'
+        author = make_client(make_user('reader'))
+        reviews = f'/api/v1/titles/{title.pk}/reviews/'
+        review = author.post(reviews, {'text': 'Да', 'score': 10}).json()
+        assert client.get(url).json()['histogram']['10'] == 1
+        author.patch(f'{reviews}{review["id"]}/', {'score': 2})
+        stats = client.get(url).json()
+        assert stats['histogram'] == histogram_from_reviews(title)
+        assert (stats['count'], stats['median']) == (4, 2)
+
+        author.delete(f'{reviews}{review["id"]}/')
+        assert client.get(url).json()['histogram'] == (
+            histogram_from_reviews(title))
+
+        ratings.rebuild()
+        assert client.get(url).json() == {
+            'count': 3, 'mean': 2.0, 'median': 2,
+            'histogram': histogram_from_reviews(title),
+        }
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            6, 3, 2.0)
+
+    def test_empty(self, client):
+        from reviews.models import Title
+        title = Title.objects.create(name='Без отзывов', year=2000)
+        assert client.get(f'/api/v1/titles/{title.pk}/stats/').json() == {
+            'count': 0, 'mean': None, 'median': None,
+            'histogram': {str(score): 0 for score in range(1, 11)},
+        }
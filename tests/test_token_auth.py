@@ -0,0 +1,87 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRoleToken:
+
+    def test_token_carries_role(self, client, make_user):
+        from django.contrib.auth.tokens import default_token_generator
+        from rest_framework_simplejwt.tokens import AccessToken
+        user = make_user('reader', role='moderator')
+        response = client.post('/api/v1/auth/token/', {
+            'username': 'reader',
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        token = AccessToken(response.json()['token'])
+        assert (token['user_id'], token['username'], token['role']) == (
+            user.pk, 'reader', 'moderator')
+
+    def test_role_change_revokes_tokens(self, admin_client, make_user,
+                                        make_client):
+        reader = make_client(make_user('reader', role='admin'))
+        assert reader.get('/api/v1/users/').status_code == 200
+
+        response = admin_client.patch(
+            '/api/v1/users/reader/', {'role': 'user'})
+        assert response.status_code == 200
+        assert reader.get('/api/v1/users/me/').status_code == 401, (
+            'Токен со старой ролью должен перестать приниматься'
+        )
+        from users.models import User
+        reader = make_client(User.objects.get(username='reader'))
+        assert reader.get('/api/v1/users/').status_code == 403
+
+    def test_delete_revokes_tokens(self, admin_client, make_user,
+                                   make_client):
+        reader = make_client(make_user('reader'))
+        assert admin_client.delete(
+            '/api/v1/users/reader/').status_code == 204
+        assert reader.get('/api/v1/titles/').status_code == 401
+
+    def test_other_changes_keep_tokens(self, admin_client, make_user,
+                                       make_client):
+        reader = make_client(make_user('reader'))
+        admin_client.patch('/api/v1/users/reader/', {'bio': 'Читатель'})
+        assert reader.get('/api/v1/users/me/').status_code == 200
+
+    def test_token_without_claims(self, make_user, catalog):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+        title, _ = catalog(1)
+        user = make_user('reader')
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        response = client.post(
+            f'/api/v1/titles/{title.pk}/reviews/',
+            {'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201
+        assert response.json()['author'] == 'reader'
+
+    def test_orm_role_change_revokes_tokens(self, make_user, make_client):
+        from users.models import User
+        reader = make_client(make_user('reader', role='admin'))
+        user = User.objects.get(username='reader')
+        user.role = User.USER
+        user.save()
+        assert reader.get('/api/v1/users/me/').status_code == 401
+
+    def test_evicted_role_read_from_db(self, make_user, make_client):
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from users.models import User
+        reader = make_client(make_user('reader', role='admin'))
+        # Без сигналов, и ключ роли вытеснен из кэша
+        User.objects.filter(username='reader').update(role=User.USER)
+        cache.clear()
+        assert reader.get('/api/v1/users/me/').status_code == 401
+
+        reader = make_client(User.objects.get(username='reader'))
+        cache.clear()
+        for expected in (1, 0):
+            with CaptureQueriesContext(connection) as queries:
+                assert reader.get('/api/v1/genres/').status_code == 200
+            lookups = [query for query in queries.captured_queries
+                       if 'users_user' in query['sql']]
+            assert len(lookups) == expected
@@ -0,0 +1,75 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def leaderboard(make_user):
+    """Одна десятка, двадцать девяток и двадцать пятерок"""
+    from reviews import ratings
+    from reviews.models import Category, Genre, Review, Title
+    users = [make_user(f'user{i}') for i in range(20)]
+    books = Category.objects.create(name='Книги', slug='books')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    titles = {}
+    for name, scores, category in (
+        ('Одна десятка', [10], books),
+        ('Много девяток', [9] * 20, None),
+        ('Много пятерок', [5] * 20, books),
+    ):
+        title = titles[name] = Title.objects.create(
+            name=name, year=2000, category=category)
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text='Отзыв', score=score)
+            for user, score in zip(users, scores))
+    titles['Много пятерок'].genre.add(drama)
+    Title.objects.create(name='Без отзывов', year=2000)
+    ratings.rebuild()
+    return titles
+
+
+@pytest.mark.django_db
+class TestTopTitles:
+    url = '/api/v1/titles/top/'
+
+    def names(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()]
+
+    def test_weighted_order(self, client, leaderboard,
+                            django_assert_num_queries):
+        # страница по индексу + жанры
+        with django_assert_num_queries(2):
+            response = client.get(self.url)
+        top = response.json()
+        assert [title['name'] for title in top] == [
+            'Много девяток', 'Одна десятка', 'Много пятерок'], (
+            'Одна оценка 10 не должна поднимать произведение на первое место'
+        )
+        assert top[1]['rating'] == 10
+        assert top[0]['weighted_rating'] > top[1]['weighted_rating']
+        assert self.names(client, limit=1) == ['Много девяток']
+        assert client.get(self.url, {'limit': 'x'}).status_code == 400
+
+    def test_filters(self, client, leaderboard):
+        assert self.names(client, category='books') == [
+            'Одна десятка', 'Много пятерок']
+        assert self.names(client, genre='drama') == ['Много пятерок']
+        assert self.names(client, genre='comedy') == []
+
+    def test_incremental_and_refresh(self, client, make_user, make_client,
+                                     leaderboard):
+        from reviews import ratings
+        single = leaderboard['Одна десятка']
+        prior = ratings.prior_mean()
+        for i in range(10):
+            make_client(make_user(f'fan{i}')).post(
+                f'/api/v1/titles/{single.pk}/reviews/',
+                {'text': 'Да', 'score': 10})
+        assert self.names(client)[0] == 'Одна десятка'
+        assert ratings.prior_mean() == prior, (
+            'Средняя оценка каталога меняется только командой'
+        )
+        call_command('refresh_top_titles')
+        assert ratings.prior_mean() > prior
+        assert self.names(client)[0] == 'Одна десятка'